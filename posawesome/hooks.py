@@ -69,6 +69,7 @@ doctype_js = {
 # after_install = "posawesome.install.after_install"
 # before_uninstall = "posawesome.uninstall.before_uninstall"
 after_uninstall = "posawesome.uninstall.after_uninstall"
+after_migrate = ["posawesome.posawesome.api.reference_version.clear_reference_versions"]
 
 # Desk Notifications
 # ------------------
@@ -96,34 +97,138 @@ doc_events = {
 	"Sales Invoice": {
 		"validate": "posawesome.posawesome.api.invoice.validate",
 		"before_submit": "posawesome.posawesome.api.invoice.before_submit",
+		"on_submit": "posawesome.posawesome.api.customer_rates.on_invoice_submit",
 		"before_cancel": "posawesome.posawesome.api.invoice.before_cancel",
+		"on_cancel": "posawesome.posawesome.api.customer_rates.on_invoice_cancel",
 	},
 	"Customer": {
 		"validate": "posawesome.posawesome.api.customer.validate",
 		"after_insert": "posawesome.posawesome.api.customer.after_insert",
+		"on_update": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"on_trash": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"after_rename": "posawesome.posawesome.api.reference_version.on_reference_change",
+	},
+	"Item": {
+		"on_update": [
+			"posawesome.posawesome.api.item_search.on_item_update",
+			"posawesome.posawesome.api.barcode_index.on_item_update",
+			"posawesome.posawesome.api.variant_matrix.on_item_update",
+		],
+		"on_trash": [
+			"posawesome.posawesome.api.item_search.on_item_trash",
+			"posawesome.posawesome.api.barcode_index.on_item_trash",
+			"posawesome.posawesome.api.variant_matrix.on_item_trash",
+		],
+		"after_rename": [
+			"posawesome.posawesome.api.item_search.on_item_rename",
+			"posawesome.posawesome.api.barcode_index.on_item_rename",
+			"posawesome.posawesome.api.variant_matrix.on_item_rename",
+		],
+	},
+	"Batch": {
+		"after_insert": "posawesome.posawesome.api.barcode_index.on_batch_update",
+		"on_trash": "posawesome.posawesome.api.barcode_index.on_code_trash",
+	},
+	"Currency Exchange": {
+		"on_update": "posawesome.posawesome.api.exchange_rates.clear_exchange_rate_cache",
+		"on_trash": "posawesome.posawesome.api.exchange_rates.clear_exchange_rate_cache",
+	},
+	"Item Price": {
+		"on_update": "posawesome.posawesome.api.effective_price.on_item_price_update",
+		"after_delete": "posawesome.posawesome.api.effective_price.on_item_price_delete",
+	},
+	"File": {
+		"after_insert": "posawesome.posawesome.api.thumbnails.on_file_insert",
+	},
+	"Serial No": {
+		"on_trash": "posawesome.posawesome.api.barcode_index.on_code_trash",
+	},
+	"Item Attribute": {
+		"on_update": "posawesome.posawesome.api.variant_matrix.on_item_attribute_update",
+		"on_trash": "posawesome.posawesome.api.variant_matrix.on_item_attribute_update",
+	},
+	"Item Group": {
+		"on_update": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+		"on_trash": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+		"after_rename": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+	},
+	"Customer Group": {
+		"on_update": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+		"on_trash": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+		"after_rename": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+	},
+	"POS Profile": {
+		"on_update": [
+			"posawesome.posawesome.api.group_tree.clear_group_tree_cache",
+			"posawesome.posawesome.api.reference_version.on_reference_change",
+		],
+		"on_trash": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"after_rename": "posawesome.posawesome.api.reference_version.on_reference_change",
+	},
+	"POS Offer": {
+		"on_update": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"on_trash": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"after_rename": "posawesome.posawesome.api.reference_version.on_reference_change",
+	},
+	"Price List": {
+		"on_update": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"on_trash": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"after_rename": "posawesome.posawesome.api.reference_version.on_reference_change",
+	},
+	"Currency": {
+		"on_update": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"on_trash": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"after_rename": "posawesome.posawesome.api.reference_version.on_reference_change",
+	},
+	"Translation": {
+		"on_update": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"on_trash": "posawesome.posawesome.api.reference_version.on_reference_change",
+		"after_rename": "posawesome.posawesome.api.reference_version.on_reference_change",
+	},
+	"Stock Ledger Entry": {
+		"on_submit": "posawesome.posawesome.api.stock_deltas.on_stock_ledger_entry_submit",
+	},
+	"Bin": {
+		"on_update": "posawesome.posawesome.api.stock_deltas.on_bin_update",
 	},
 }
 
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"posawesome.tasks.all"
-# 	],
-# 	"daily": [
-# 		"posawesome.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"posawesome.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"posawesome.tasks.weekly"
-# 	]
-# 	"monthly": [
-# 		"posawesome.tasks.monthly"
-# 	]
-# }
+scheduler_events = {
+	"all": [
+		"posawesome.posawesome.api.stock_deltas.flush_stock_deltas",
+	],
+	"hourly": [
+		"posawesome.posawesome.api.catalog_snapshot.rebuild_all_catalog_snapshots",
+	],
+	"daily": [
+		"posawesome.posawesome.api.barcode_index.enqueue_rebuild_barcode_index",
+		"posawesome.posawesome.api.exchange_rates.clear_exchange_rate_cache",
+	],
+	"daily_long": [
+		"posawesome.posawesome.api.effective_price.rebuild_effective_prices",
+	],
+}
 
 # Testing
 # -------
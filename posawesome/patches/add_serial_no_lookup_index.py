@@ -0,0 +1,10 @@
+import frappe
+
+
+def execute():
+	try:
+		frappe.db.add_index(
+			"Serial No", ["item_code", "warehouse", "status", "name"], index_name="item_warehouse_status_name"
+		)
+	except Exception as e:
+		frappe.log_error(str(e), "Add Serial No lookup index")
@@ -0,0 +1,5 @@
+from posawesome.posawesome.api.barcode_index import enqueue_rebuild_barcode_index
+
+
+def execute():
+	enqueue_rebuild_barcode_index()
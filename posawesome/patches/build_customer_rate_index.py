@@ -0,0 +1,8 @@
+import frappe
+
+from posawesome.posawesome.api.customer_rates import rebuild_customer_rates
+
+
+def execute():
+	frappe.reload_doc("posawesome", "doctype", "pos_customer_item_rate")
+	rebuild_customer_rates()
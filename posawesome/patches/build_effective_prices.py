@@ -0,0 +1,9 @@
+import frappe
+
+from posawesome.posawesome.api.effective_price import rebuild_effective_prices
+
+
+def execute():
+	frappe.reload_doc("posawesome", "doctype", "pos_effective_price")
+	# Built inline so prices are readable as soon as the migration ends
+	rebuild_effective_prices()
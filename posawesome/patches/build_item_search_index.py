@@ -0,0 +1,5 @@
+from posawesome.posawesome.api.item_search import enqueue_rebuild_item_search_index
+
+
+def execute():
+	enqueue_rebuild_item_search_index()
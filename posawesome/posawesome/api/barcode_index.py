@@ -0,0 +1,231 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Prebuilt scan code index for the till.
+
+Every scannable code (item barcode, batch number, serial number) maps to an
+``(item_code, uom, batch_no, serial_no)`` entry held in a Redis hash, so a
+scan is a single hash lookup. Item barcodes and batches are loaded up front;
+serial numbers are resolved from the database on first scan and then kept in
+the hash. Doc events keep the hash in step with Item and Batch changes.
+"""
+
+import json
+import pickle
+
+import frappe
+from frappe.utils import cint, flt
+from frappe.utils.background_jobs import enqueue
+
+from posawesome.posawesome.api.item_enrichment import ITEM_FIELDS, enrich_items, get_item_prices_map
+
+BARCODE_INDEX_KEY = "posa_barcode_index"
+SCALE_BARCODE_ITEM_LENGTH = 7
+SCALE_BARCODE_WEIGHT_LENGTH = 5
+INDEX_BATCH_SIZE = 5000
+
+
+def _entry(item_code, uom=None, batch_no=None, serial_no=None):
+	return {"item_code": item_code, "uom": uom, "batch_no": batch_no, "serial_no": serial_no}
+
+
+def _lookup_code_in_db(code):
+	"""Resolve ``code`` with one query, preferring barcodes over batches over serials."""
+	rows = frappe.db.sql(
+		"""
+		SELECT item_code, uom, batch_no, serial_no FROM (
+			SELECT parent AS item_code, posa_uom AS uom, NULL AS batch_no, NULL AS serial_no, 1 AS priority
+			FROM `tabItem Barcode`
+			WHERE barcode = %(code)s AND parenttype = 'Item'
+			UNION ALL
+			SELECT item AS item_code, NULL, name, NULL, 2
+			FROM `tabBatch`
+			WHERE name = %(code)s
+			UNION ALL
+			SELECT item_code, NULL, NULL, name, 3
+			FROM `tabSerial No`
+			WHERE name = %(code)s
+		) codes
+		ORDER BY priority
+		LIMIT 1
+		""",
+		{"code": code},
+		as_dict=True,
+	)
+	return _entry(**rows[0]) if rows else None
+
+
+def resolve_code(code):
+	"""Return the index entry for ``code`` or ``None`` when it is unknown."""
+	if not code:
+		return None
+	entry = frappe.cache().hget(BARCODE_INDEX_KEY, code)
+	if entry:
+		return entry
+	entry = _lookup_code_in_db(code)
+	if entry:
+		frappe.cache().hset(BARCODE_INDEX_KEY, code, entry)
+	return entry
+
+
+def decode_scale_barcode(code, prefix):
+	"""Split a weight-embedded scale barcode into ``(item_lookup_code, qty)``.
+
+	The first ``SCALE_BARCODE_ITEM_LENGTH`` characters identify the item and
+	the next ``SCALE_BARCODE_WEIGHT_LENGTH`` digits carry the weight in grams,
+	matching the client side ``get_item_qty`` decoding.
+	"""
+	weight_end = SCALE_BARCODE_ITEM_LENGTH + SCALE_BARCODE_WEIGHT_LENGTH
+	if not prefix or not code or not code.startswith(prefix) or len(code) < weight_end:
+		return None
+	weight = code[SCALE_BARCODE_ITEM_LENGTH:weight_end]
+	if not weight.isdigit():
+		return None
+	return code[:SCALE_BARCODE_ITEM_LENGTH], flt(weight) / 1000
+
+
+def _iter_batches(doctype, fields, filters=None):
+	"""Yield rows of ``doctype`` in name order, ``INDEX_BATCH_SIZE`` at a time."""
+	last_name = ""
+	while True:
+		rows = frappe.get_all(
+			doctype,
+			filters={**(filters or {}), "name": [">", last_name]},
+			fields=["name", *fields],
+			order_by="name asc",
+			limit_page_length=INDEX_BATCH_SIZE,
+		)
+		if not rows:
+			break
+		yield rows
+		last_name = rows[-1].name
+
+
+def rebuild_barcode_index():
+	"""Reload item barcodes and batches into the index; run as a background job.
+
+	The index is built under a scratch key, one pipelined write per batch, and
+	renamed over the live one at the end so scans never see it half built.
+	"""
+	# Raw redis commands on prefixed keys; values are pickled as frappe's
+	# hset does so resolve_code reads them back with hget
+	cache = frappe.cache()
+	live_key = cache.make_key(BARCODE_INDEX_KEY)
+	build_key = cache.make_key(f"{BARCODE_INDEX_KEY}_rebuild")
+	cache.delete(build_key)
+
+	for rows in _iter_batches("Item Barcode", ["barcode", "parent", "posa_uom"], {"parenttype": "Item"}):
+		pipe = cache.pipeline(transaction=False)
+		pipe.hset(
+			build_key,
+			mapping={row.barcode: pickle.dumps(_entry(row.parent, uom=row.posa_uom)) for row in rows},
+		)
+		pipe.execute()
+
+	for rows in _iter_batches("Batch", ["item"]):
+		# Item barcodes win over batch numbers sharing the same code
+		pipe = cache.pipeline(transaction=False)
+		for row in rows:
+			pipe.hsetnx(build_key, row.name, pickle.dumps(_entry(row.item, batch_no=row.name)))
+		pipe.execute()
+
+	if cache.exists(f"{BARCODE_INDEX_KEY}_rebuild"):
+		cache.rename(build_key, live_key)
+	else:
+		cache.delete(live_key)
+
+
+def enqueue_rebuild_barcode_index():
+	enqueue(
+		method=rebuild_barcode_index,
+		queue="long",
+		timeout=3600,
+		job_id="pos_barcode_index_rebuild",
+		deduplicate=True,
+	)
+
+
+@frappe.whitelist()
+def scan_barcode(pos_profile, code, price_list=None, customer=None):
+	"""Resolve a scanned code to a cart-ready item row in one round trip."""
+	profile = json.loads(pos_profile) if isinstance(pos_profile, str) else pos_profile
+	price_list = price_list or profile.get("selling_price_list")
+	code = (code or "").strip()
+
+	qty = None
+	entry = resolve_code(code)
+	if not entry:
+		scale = decode_scale_barcode(code, profile.get("posa_scale_barcode_start"))
+		if scale:
+			entry = resolve_code(scale[0])
+			qty = scale[1]
+	if not entry:
+		return None
+	if entry.get("serial_no") and not profile.get("posa_search_serial_no"):
+		return None
+
+	items_data = frappe.get_all(
+		"Item",
+		filters={"name": entry["item_code"], "disabled": 0, "is_sales_item": 1},
+		fields=ITEM_FIELDS,
+	)
+	if not items_data:
+		return None
+
+	# A scan must always reach the cart; stock checks happen when adding it
+	rows = enrich_items(
+		items_data,
+		dict(profile, posa_display_items_in_stock=0),
+		price_list,
+		customer=customer,
+		use_limit_search=True,
+	)
+	row = rows[0]
+	row.update(
+		{
+			"barcode": code,
+			"uom": entry.get("uom") or row.get("stock_uom"),
+			"batch_no": entry.get("batch_no"),
+			"serial_no": entry.get("serial_no"),
+			"qty": qty,
+			"is_scale_barcode": cint(qty is not None),
+		}
+	)
+
+	if entry.get("uom") and entry["uom"] != row.get("stock_uom"):
+		price_list_currency = frappe.db.get_value("Price List", price_list, "currency")
+		uom_prices = get_item_prices_map(
+			[row["item_code"]], price_list, price_list_currency or profile.get("currency"), customer
+		).get(row["item_code"], {})
+		if uom_prices.get(entry["uom"]):
+			row["rate"] = uom_prices[entry["uom"]].price_list_rate
+			row["price_list_rate"] = row["rate"]
+	return row
+
+
+def on_item_update(doc, method=None):
+	before = doc.get_doc_before_save()
+	current = {d.barcode for d in doc.get("barcodes") or []}
+	for d in (before.get("barcodes") if before else None) or []:
+		if d.barcode not in current:
+			frappe.cache().hdel(BARCODE_INDEX_KEY, d.barcode)
+	for d in doc.get("barcodes") or []:
+		frappe.cache().hset(BARCODE_INDEX_KEY, d.barcode, _entry(doc.name, uom=d.get("posa_uom")))
+
+
+def on_item_trash(doc, method=None):
+	for d in doc.get("barcodes") or []:
+		frappe.cache().hdel(BARCODE_INDEX_KEY, d.barcode)
+
+
+def on_item_rename(doc, method=None, old=None, new=None, merge=False):
+	enqueue_rebuild_barcode_index()
+
+
+def on_batch_update(doc, method=None):
+	if not frappe.cache().hget(BARCODE_INDEX_KEY, doc.name):
+		frappe.cache().hset(BARCODE_INDEX_KEY, doc.name, _entry(doc.item, batch_no=doc.name))
+
+
+def on_code_trash(doc, method=None):
+	frappe.cache().hdel(BARCODE_INDEX_KEY, doc.name)
@@ -0,0 +1,251 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Precomputed per-profile POS catalog snapshots.
+
+A snapshot is a gzip compressed JSON artifact holding every item row of a
+POS Profile (prices, barcodes, UOMs and stock included) for a given price
+list and warehouse. Terminals read the manifest, then download the artifact
+in fixed-size chunks instead of rebuilding the catalog through ``get_items``.
+
+Artifacts are written under versioned names before the manifest points at
+them, and the previous version is kept, so a terminal midway through a
+download keeps reading the version it started with.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import now_datetime
+from frappe.utils.background_jobs import enqueue
+
+from posawesome.posawesome.api.group_tree import get_profile_groups
+from posawesome.posawesome.api.item_enrichment import enrich_items, get_item_query_fields
+
+CHUNK_SIZE = 512 * 1024
+BUILD_BATCH_SIZE = 1000
+SNAPSHOT_FOLDER = "pos_catalog_snapshots"
+
+
+def _snapshot_key(pos_profile, price_list, warehouse):
+	return hashlib.sha1(f"{pos_profile}|{price_list}|{warehouse}".encode()).hexdigest()
+
+
+def _snapshot_folder():
+	folder = frappe.get_site_path("private", "files", SNAPSHOT_FOLDER)
+	os.makedirs(folder, exist_ok=True)
+	return folder
+
+
+def _manifest_path(key):
+	return os.path.join(_snapshot_folder(), f"{key}.manifest.json")
+
+
+def _artifact_path(key, version):
+	return os.path.join(_snapshot_folder(), f"{key}.v{int(version)}.json.gz")
+
+
+def _remove_old_artifacts(key, keep_from_version):
+	prefix = f"{key}.v"
+	for name in os.listdir(_snapshot_folder()):
+		if not (name.startswith(prefix) and name.endswith(".json.gz")):
+			continue
+		version = name[len(prefix) : -len(".json.gz")]
+		if version.isdigit() and int(version) < keep_from_version:
+			try:
+				os.remove(os.path.join(_snapshot_folder(), name))
+			except OSError:
+				pass
+
+
+def _read_manifest(manifest_path):
+	if not os.path.exists(manifest_path):
+		return None
+	try:
+		with open(manifest_path) as f:
+			return json.load(f)
+	except (OSError, ValueError):
+		return None
+
+
+def _resolve_profile(pos_profile, price_list=None):
+	if isinstance(pos_profile, str) and pos_profile.startswith("{"):
+		pos_profile = json.loads(pos_profile).get("name")
+	elif isinstance(pos_profile, dict):
+		pos_profile = pos_profile.get("name")
+
+	profile = frappe.get_cached_doc("POS Profile", pos_profile).as_dict()
+	return profile, price_list or profile.get("selling_price_list"), profile.get("warehouse")
+
+
+def iter_catalog_items(
+	profile, price_list, customer=None, item_group=None, fields=None, batch_size=BUILD_BATCH_SIZE
+):
+	"""Yield enriched item rows of ``profile`` in batches of ``batch_size``.
+
+	Batches are read with a keyset on ``(item_name, name)`` so each one costs
+	the same however deep into the catalog it is.
+	"""
+	filters = [["disabled", "=", 0], ["is_sales_item", "=", 1], ["is_fixed_asset", "=", 0]]
+	item_groups = get_profile_groups(profile.get("name"), "Item Group")
+	if item_groups:
+		filters.append(["item_group", "in", item_groups])
+	if item_group and item_group.upper() != "ALL":
+		filters.append(["item_group", "like", f"%{item_group}%"])
+	if not profile.get("posa_show_template_items"):
+		filters.append(["has_variants", "=", 0])
+
+	after = None
+	while True:
+		query_filters = list(filters)
+		if after:
+			last_item_name = frappe.db.escape(after[0])
+			query_filters.append(
+				f"(`tabItem`.`item_name` > {last_item_name} or "
+				f"(`tabItem`.`item_name` = {last_item_name} and `tabItem`.`name` > {frappe.db.escape(after[1])}))"
+			)
+		items_data = frappe.get_all(
+			"Item",
+			filters=query_filters,
+			fields=get_item_query_fields(fields),
+			order_by="item_name asc, name asc",
+			limit_page_length=batch_size,
+		)
+		if not items_data:
+			break
+		yield enrich_items(items_data, profile, price_list, customer=customer, use_limit_search=True, fields=fields)
+		if len(items_data) < batch_size:
+			break
+		after = (items_data[-1].item_name, items_data[-1].item_code)
+
+
+def build_catalog_snapshot(pos_profile, price_list=None):
+	"""Write the snapshot artifact and manifest for ``pos_profile``."""
+	profile, price_list, warehouse = _resolve_profile(pos_profile, price_list)
+	key = _snapshot_key(profile.name, price_list, warehouse)
+	manifest_path = _manifest_path(key)
+	previous = _read_manifest(manifest_path) or {}
+	version = (previous.get("version") or 0) + 1
+	artifact_path = _artifact_path(key, version)
+
+	built_at = now_datetime()
+	tmp_path = f"{artifact_path}.tmp"
+	item_count = 0
+	with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+		f.write("[")
+		for rows in iter_catalog_items(profile, price_list):
+			for row in rows:
+				if item_count:
+					f.write(",")
+				f.write(frappe.as_json(row, indent=None))
+				item_count += 1
+		f.write("]")
+
+	checksum = hashlib.sha256()
+	with open(tmp_path, "rb") as f:
+		for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+			checksum.update(block)
+	size = os.path.getsize(tmp_path)
+	os.replace(tmp_path, artifact_path)
+
+	manifest = {
+		"pos_profile": profile.name,
+		"price_list": price_list,
+		"warehouse": warehouse,
+		"version": version,
+		"built_at": str(built_at),
+		"item_count": item_count,
+		"size": size,
+		"chunk_size": CHUNK_SIZE,
+		"chunk_count": (size + CHUNK_SIZE - 1) // CHUNK_SIZE,
+		"sha256": checksum.hexdigest(),
+		"encoding": "gzip",
+	}
+	with open(f"{manifest_path}.tmp", "w") as f:
+		json.dump(manifest, f)
+	os.replace(f"{manifest_path}.tmp", manifest_path)
+	_remove_old_artifacts(key, version - 1)
+	return manifest
+
+
+def enqueue_catalog_snapshot(pos_profile, price_list=None):
+	"""Queue a snapshot build, ignoring duplicates already in the queue."""
+	enqueue(
+		method=build_catalog_snapshot,
+		queue="long",
+		timeout=3600,
+		job_id=f"pos_catalog_snapshot::{pos_profile}::{price_list or ''}",
+		deduplicate=True,
+		pos_profile=pos_profile,
+		price_list=price_list,
+	)
+
+
+@frappe.whitelist()
+def get_catalog_snapshot_manifest(pos_profile, price_list=None):
+	"""Return the current snapshot manifest, queueing a build when none exists."""
+	profile, price_list, warehouse = _resolve_profile(pos_profile, price_list)
+	manifest = _read_manifest(_manifest_path(_snapshot_key(profile.name, price_list, warehouse)))
+	if not manifest:
+		enqueue_catalog_snapshot(profile.name, price_list)
+		return {"status": "building"}
+	return dict(manifest, status="ready")
+
+
+@frappe.whitelist()
+def get_catalog_snapshot_chunk(pos_profile, version, chunk_index, price_list=None):
+	"""Return chunk ``chunk_index`` of snapshot ``version`` as base64.
+
+	The previous version stays readable after a rebuild, so a download in
+	progress finishes on the artifact its manifest described.
+	"""
+	profile, price_list, warehouse = _resolve_profile(pos_profile, price_list)
+	artifact_path = _artifact_path(_snapshot_key(profile.name, price_list, warehouse), version)
+	if not os.path.exists(artifact_path):
+		frappe.throw(_("Catalog snapshot version {0} is no longer available").format(version))
+
+	chunk_index = int(chunk_index)
+	size = os.path.getsize(artifact_path)
+	if chunk_index < 0 or chunk_index * CHUNK_SIZE >= size:
+		frappe.throw(_("Invalid catalog snapshot chunk {0}").format(chunk_index))
+
+	with open(artifact_path, "rb") as f:
+		f.seek(chunk_index * CHUNK_SIZE)
+		data = f.read(CHUNK_SIZE)
+
+	return {
+		"version": int(version),
+		"chunk_index": chunk_index,
+		"data": base64.b64encode(data).decode(),
+	}
+
+
+@frappe.whitelist()
+def rebuild_catalog_snapshot(pos_profile, price_list=None):
+	"""Queue a fresh snapshot for ``pos_profile``."""
+	profile, price_list, _warehouse = _resolve_profile(pos_profile, price_list)
+	enqueue_catalog_snapshot(profile.name, price_list)
+	return {"status": "queued"}
+
+
+def enqueue_price_list_snapshots(price_lists):
+	"""Queue fresh snapshots of local-storage profiles selling from ``price_lists``."""
+	for name in frappe.get_all(
+		"POS Profile",
+		filters={"disabled": 0, "posa_local_storage": 1, "selling_price_list": ["in", list(price_lists)]},
+		pluck="name",
+	):
+		enqueue_catalog_snapshot(name)
+
+
+def rebuild_all_catalog_snapshots():
+	"""Scheduler entry point: refresh snapshots of local-storage profiles."""
+	for name in frappe.get_all(
+		"POS Profile", filters={"disabled": 0, "posa_local_storage": 1}, pluck="name"
+	):
+		enqueue_catalog_snapshot(name)
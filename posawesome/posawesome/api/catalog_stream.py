@@ -0,0 +1,64 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Streaming NDJSON export of a POS Profile's catalog.
+
+Items are read in keyset batches and written to the response as one JSON
+object per line while the next batch is fetched, so worker memory stays
+flat however large the catalog is and clients can render the first batch
+before the last one is read. The final line is ``{"done": 1, "item_count": n}``;
+a stream that ends without it was cut short.
+"""
+
+import frappe
+from werkzeug.wrappers import Response
+
+from posawesome.posawesome.api.catalog_snapshot import iter_catalog_items
+from posawesome.posawesome.api.item_enrichment import parse_fields
+from posawesome.posawesome.api.pos_context import get_pos_context
+
+STREAM_BATCH_SIZE = 500
+MAX_STREAM_BATCH_SIZE = 2000
+
+
+@frappe.whitelist()
+def stream_items(pos_profile, price_list=None, item_group=None, customer=None, fields=None, batch_size=None):
+	"""Stream the items of ``pos_profile`` as newline-delimited JSON."""
+	profile = get_pos_context(pos_profile).profile
+	price_list = price_list or profile.get("selling_price_list")
+	fields = parse_fields(fields)
+	batch_size = min(int(batch_size or STREAM_BATCH_SIZE), MAX_STREAM_BATCH_SIZE)
+
+	site, sites_path, user = frappe.local.site, frappe.local.sites_path, frappe.session.user
+
+	def generate():
+		# The server iterates the body after the request handler has returned
+		# and frappe.destroy() has released frappe.local, so open a context of
+		# our own unless one is still active.
+		own_context = not getattr(frappe.local, "db", None)
+		if own_context:
+			frappe.init(site=site, sites_path=sites_path)
+			frappe.connect()
+			frappe.set_user(user)
+		item_count = 0
+		try:
+			for rows in iter_catalog_items(
+				profile,
+				price_list,
+				customer=customer,
+				item_group=item_group,
+				fields=fields,
+				batch_size=batch_size,
+			):
+				item_count += len(rows)
+				yield "".join(frappe.as_json(row, indent=None) + "\n" for row in rows)
+			yield frappe.as_json({"done": 1, "item_count": item_count}, indent=None) + "\n"
+		finally:
+			if own_context:
+				frappe.destroy()
+
+	response = Response(generate(), mimetype="application/x-ndjson", direct_passthrough=True)
+	# Keep nginx from buffering the whole body before forwarding it
+	response.headers["X-Accel-Buffering"] = "no"
+	response.headers["Cache-Control"] = "no-store"
+	return response
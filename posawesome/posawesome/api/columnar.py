@@ -0,0 +1,143 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Columnar wire format for bulk item and customer payloads.
+
+Row lists repeat every key on every row. ``encode_columnar`` sends a field
+list plus one array per field instead. Columns whose values repeat (UOM
+tables, groups, currencies) are dictionary-encoded, and list-of-dict columns
+such as barcodes are sent as value tuples under a shared key list.
+``to_wire_format`` wraps the result in a response compressed with brotli or
+gzip, whichever the client accepts.
+"""
+
+import gzip
+
+import frappe
+from werkzeug.wrappers import Response
+
+try:
+	import brotli
+except ImportError:
+	brotli = None
+
+COLUMNAR = "columnar"
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+
+def _dump(value):
+	return frappe.as_json(value, indent=None)
+
+
+def _dictionary_encode(values):
+	lookup = {}
+	dictionary = []
+	indexes = []
+	for value in values:
+		# Keyed by type too: True == 1 and 0 == 0.0 must stay distinct entries
+		key = (type(value), _dump(value) if isinstance(value, (list, dict)) else value)
+		index = lookup.get(key)
+		if index is None:
+			index = lookup[key] = len(dictionary)
+			dictionary.append(value)
+		indexes.append(index)
+	return dictionary, indexes
+
+
+def _tuple_keys(values):
+	"""Return the shared keys of a column of ``[{...}]`` lists, or ``None``."""
+	keys = {}
+	for value in values:
+		if value is None:
+			continue
+		if not isinstance(value, list) or not all(isinstance(d, dict) for d in value):
+			return None
+		for entry in value:
+			keys.update(dict.fromkeys(entry))
+	return list(keys) or None
+
+
+def encode_columnar(rows):
+	"""Return ``rows`` as ``{format, count, fields, columns, encodings}``.
+
+	``encodings`` maps a field to ``{"type": "dict", "values": [...]}`` when its
+	column holds indexes into ``values``, or to ``{"type": "tuples", "keys": [...]}``
+	when each cell is a list of value arrays ordered as ``keys``. Other columns
+	hold plain values.
+	"""
+	fields = {}
+	for row in rows:
+		fields.update(dict.fromkeys(row))
+	fields = list(fields)
+
+	columns = []
+	encodings = {}
+	for field in fields:
+		values = [row.get(field) for row in rows]
+		dictionary, indexes = _dictionary_encode(values)
+		if len(values) > 1 and len(dictionary) * 2 <= len(values):
+			encodings[field] = {"type": "dict", "values": dictionary}
+			columns.append(indexes)
+			continue
+
+		keys = _tuple_keys(values)
+		if keys:
+			encodings[field] = {"type": "tuples", "keys": keys}
+			columns.append(
+				[None if value is None else [[d.get(k) for k in keys] for d in value] for value in values]
+			)
+			continue
+
+		columns.append(values)
+
+	return {
+		"format": COLUMNAR,
+		"count": len(rows),
+		"fields": fields,
+		"columns": columns,
+		"encodings": encodings,
+	}
+
+
+def _accepted_encoding():
+	accept = (frappe.get_request_header("Accept-Encoding") or "").lower()
+	if brotli and "br" in accept:
+		return "br"
+	if "gzip" in accept:
+		return "gzip"
+	return None
+
+
+def to_wire_format(result, wire_format=None, rows_key=None):
+	"""Return ``result`` encoded as ``wire_format``, or unchanged when not requested.
+
+	``rows_key`` names the row list inside a dict result, such as the
+	``items`` of a cursor page; the dict is sent as is when it holds no list
+	there.
+	"""
+	if wire_format != COLUMNAR:
+		return result
+
+	if rows_key and isinstance(result, dict):
+		result = dict(result)
+		if isinstance(result.get(rows_key), list):
+			result[rows_key] = encode_columnar(result[rows_key])
+	else:
+		result = encode_columnar(result or [])
+
+	if not getattr(frappe.local, "request", None):
+		return result
+
+	body = _dump({"message": result}).encode()
+	response = Response(mimetype="application/json")
+	encoding = _accepted_encoding() if len(body) >= MIN_COMPRESS_SIZE else None
+	if encoding == "br":
+		body = brotli.compress(body, quality=5)
+	elif encoding == "gzip":
+		body = gzip.compress(body, compresslevel=6)
+	if encoding:
+		response.headers["Content-Encoding"] = encoding
+	response.headers["Vary"] = "Accept-Encoding"
+	response.data = body
+	return response
@@ -0,0 +1,177 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Maintained index of the last rate each customer paid for each item.
+
+``POS Customer Item Rate`` keeps one row per (customer, item), named by a
+hash of the pair, with the rate and posting date of the latest submitted
+Sales Invoice line. Submitting an invoice moves the rows of its items
+forward, and cancelling one recomputes them from the remaining invoices.
+Readers fetch a whole page of items by primary key.
+"""
+
+import hashlib
+
+import frappe
+
+CUSTOMER_RATE_DOCTYPE = "POS Customer Item Rate"
+
+
+def get_rate_key(customer, item_code):
+	return hashlib.md5(f"{customer}::{item_code}".encode()).hexdigest()
+
+
+def get_last_customer_rates(item_codes, customer):
+	"""Return ``{item_code: rate}`` last invoiced to ``customer``."""
+	if not item_codes or not customer:
+		return {}
+	names = [get_rate_key(customer, code) for code in set(item_codes)]
+	return dict(
+		frappe.db.sql(
+			"SELECT item_code, rate FROM `tabPOS Customer Item Rate` WHERE name IN %(names)s",
+			{"names": tuple(names)},
+		)
+	)
+
+
+def _write_rates(customer, rows):
+	"""Replace the index rows of ``customer`` with ``rows`` keyed by item code."""
+	if not rows:
+		return
+	names = [get_rate_key(customer, code) for code in rows]
+	frappe.db.delete(CUSTOMER_RATE_DOCTYPE, {"name": ["in", names]})
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		CUSTOMER_RATE_DOCTYPE,
+		fields=[
+			"name",
+			"customer",
+			"item_code",
+			"rate",
+			"posting_date",
+			"sales_invoice",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				get_rate_key(customer, item_code),
+				customer,
+				item_code,
+				row.rate,
+				row.posting_date,
+				row.sales_invoice,
+				now,
+				now,
+				"Administrator",
+				"Administrator",
+			)
+			for item_code, row in rows.items()
+		],
+	)
+
+
+def _get_latest_invoice_rates(customer, item_codes):
+	return frappe.db.sql(
+		"""
+		SELECT item_code, rate, posting_date, sales_invoice
+		FROM (
+			SELECT
+				sii.item_code,
+				sii.rate,
+				si.posting_date,
+				si.name AS sales_invoice,
+				ROW_NUMBER() OVER (
+					PARTITION BY sii.item_code
+					ORDER BY si.posting_date DESC, si.creation DESC, sii.idx DESC
+				) AS rn
+			FROM `tabSales Invoice Item` sii
+			INNER JOIN `tabSales Invoice` si ON sii.parent = si.name
+			WHERE sii.item_code IN %(item_codes)s
+			AND si.customer = %(customer)s
+			AND si.docstatus = 1
+		) latest
+		WHERE rn = 1
+		""",
+		{"item_codes": tuple(item_codes), "customer": customer},
+		as_dict=True,
+	)
+
+
+def on_invoice_submit(doc, method=None):
+	item_codes = {d.item_code for d in doc.items if d.item_code}
+	if not doc.customer or not item_codes:
+		return
+
+	current = {
+		row.item_code: row
+		for row in frappe.get_all(
+			CUSTOMER_RATE_DOCTYPE,
+			filters={"name": ["in", [get_rate_key(doc.customer, code) for code in item_codes]]},
+			fields=["item_code", "posting_date"],
+		)
+	}
+	posting_date = frappe.utils.getdate(doc.posting_date)
+	rows = {}
+	# Later lines of the same item win, as in the invoice history lookup
+	for d in doc.items:
+		if not d.item_code:
+			continue
+		existing = current.get(d.item_code)
+		if existing and existing.posting_date and frappe.utils.getdate(existing.posting_date) > posting_date:
+			# A later invoice already holds the last rate
+			continue
+		rows[d.item_code] = frappe._dict(rate=d.rate, posting_date=posting_date, sales_invoice=doc.name)
+	_write_rates(doc.customer, rows)
+
+
+def on_invoice_cancel(doc, method=None):
+	item_codes = {d.item_code for d in doc.items if d.item_code}
+	if not doc.customer or not item_codes:
+		return
+
+	affected = frappe.get_all(
+		CUSTOMER_RATE_DOCTYPE,
+		filters={"customer": doc.customer, "item_code": ["in", list(item_codes)], "sales_invoice": doc.name},
+		pluck="item_code",
+	)
+	if not affected:
+		return
+	frappe.db.delete(
+		CUSTOMER_RATE_DOCTYPE, {"name": ["in", [get_rate_key(doc.customer, code) for code in affected]]}
+	)
+	_write_rates(doc.customer, {row.item_code: row for row in _get_latest_invoice_rates(doc.customer, affected)})
+
+
+def rebuild_customer_rates():
+	"""Rebuild the whole index from submitted Sales Invoices."""
+	frappe.db.truncate(CUSTOMER_RATE_DOCTYPE)
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabPOS Customer Item Rate`
+			(name, customer, item_code, rate, posting_date, sales_invoice, creation, modified, owner, modified_by)
+		SELECT
+			MD5(CONCAT(customer, '::', item_code)), customer, item_code, rate, posting_date, sales_invoice,
+			NOW(), NOW(), 'Administrator', 'Administrator'
+		FROM (
+			SELECT
+				si.customer,
+				sii.item_code,
+				sii.rate,
+				si.posting_date,
+				si.name AS sales_invoice,
+				ROW_NUMBER() OVER (
+					PARTITION BY si.customer, sii.item_code
+					ORDER BY si.posting_date DESC, si.creation DESC, sii.idx DESC
+				) AS rn
+			FROM `tabSales Invoice Item` sii
+			INNER JOIN `tabSales Invoice` si ON sii.parent = si.name
+			WHERE si.docstatus = 1
+			AND si.customer IS NOT NULL
+			AND sii.item_code IS NOT NULL
+		) latest
+		WHERE rn = 1
+		"""
+	)
@@ -5,37 +5,25 @@
 from __future__ import unicode_literals
 import json
 import frappe
-from frappe.utils import nowdate, flt, cstr
+from frappe.utils import nowdate, flt, cstr, cint
 from frappe import _
 from erpnext.accounts.doctype.loyalty_program.loyalty_program import (
 	get_loyalty_program_details_with_points,
 )
 from frappe.utils.caching import redis_cache
 
+from posawesome.posawesome.api.columnar import to_wire_format
+from posawesome.posawesome.api.group_tree import get_profile_groups
+from posawesome.posawesome.api.reference_version import with_content_version
+from posawesome.posawesome.api.utils import decode_cursor, encode_cursor
 
-def get_customer_groups(pos_profile):
-	customer_groups = []
-	if pos_profile.get("customer_groups"):
-		# Get items based on the item groups defined in the POS profile
-		for data in pos_profile.get("customer_groups"):
-			customer_groups.extend(
-				[
-					"%s" % frappe.db.escape(d.get("name"))
-					for d in get_child_nodes("Customer Group", data.get("customer_group"))
-				]
-			)
-
-	return list(set(customer_groups))
+DEFAULT_CURSOR_PAGE_SIZE = 500
 
 
-def get_child_nodes(group_type, root):
-	lft, rgt = frappe.db.get_value(group_type, root, ["lft", "rgt"])
-	return frappe.get_all(
-		group_type,
-		filters={"lft": [">=", lft], "rgt": ["<=", rgt]},
-		fields=["name", "lft", "rgt"],
-		order_by="lft",
-	)
+def get_customer_groups(pos_profile):
+	return [
+		frappe.db.escape(name) for name in get_profile_groups(pos_profile.get("name"), "Customer Group")
+	]
 
 
 def get_customer_group_condition(pos_profile):
@@ -48,7 +36,9 @@ def get_customer_group_condition(pos_profile):
 
 
 @frappe.whitelist()
-def get_customer_names(pos_profile, limit=None, offset=None, modified_after=None):
+def get_customer_names(
+	pos_profile, limit=None, offset=None, modified_after=None, cursor=None, wire_format=None, version=None
+):
 	_pos_profile = json.loads(pos_profile)
 	ttl = _pos_profile.get("posa_server_cache_duration")
 	if ttl:
@@ -58,7 +48,7 @@ def get_customer_names(pos_profile, limit=None, offset=None, modified_after=None
 	def __get_customer_names(pos_profile, limit=None, offset=None, modified_after=None):
 		return _get_customer_names(pos_profile, limit, offset, modified_after)
 
-	def _get_customer_names(pos_profile, limit=None, offset=None, modified_after=None):
+	def _get_customer_names(pos_profile, limit=None, offset=None, modified_after=None, cursor=None):
 		pos_profile = json.loads(pos_profile)
 		filters = {"disabled": 0}
 
@@ -69,6 +59,14 @@ def get_customer_names(pos_profile, limit=None, offset=None, modified_after=None
 		if modified_after:
 		        filters["modified"] = [">", modified_after]
 
+		# Keyset pagination on name: an empty cursor requests the first page
+		if cursor is not None:
+			offset = None
+			limit = cint(limit) or DEFAULT_CURSOR_PAGE_SIZE
+			after = decode_cursor(cursor)
+			if after:
+				filters["name"] = [">", after[0]]
+
 		customers = frappe.get_all(
 		        "Customer",
 		        filters=filters,
@@ -84,12 +82,26 @@ def get_customer_names(pos_profile, limit=None, offset=None, modified_after=None
 		        limit_start=offset,
 		        limit_page_length=limit,
 		)
+
+		if cursor is not None:
+			next_cursor = None
+			if len(customers) == limit:
+				next_cursor = encode_cursor(customers[-1].name)
+			return {"customers": customers, "next_cursor": next_cursor}
 		return customers
 
-	if _pos_profile.get("posa_use_server_cache") and not (limit or offset or modified_after):
-		return __get_customer_names(pos_profile, limit, offset, modified_after)
-	else:
-		return _get_customer_names(pos_profile, limit, offset, modified_after)
+	def build():
+		if _pos_profile.get("posa_use_server_cache") and not (limit or offset or modified_after or cursor is not None):
+			return __get_customer_names(pos_profile, limit, offset, modified_after)
+		return _get_customer_names(pos_profile, limit, offset, modified_after, cursor)
+
+	result = with_content_version(
+		["Customer", "Customer Group", "POS Profile"],
+		[_pos_profile.get("name"), limit, offset, modified_after, cursor],
+		version,
+		build,
+	)
+	return to_wire_format(result, wire_format, rows_key="data" if version is not None else "customers")
 
 
 @frappe.whitelist()
@@ -0,0 +1,204 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Materialized effective selling prices.
+
+``POS Effective Price`` holds one row per price list, item, UOM, customer
+and currency: the selling Item Price valid today, picking the latest
+``valid_from`` and then the most recently modified. Rows are refreshed
+whenever an Item Price changes and the whole table is rebuilt daily, so
+prices whose validity starts or ends roll over. Price readers look rows up
+here instead of each re-filtering Item Price validity.
+
+An empty ``uom`` or ``customer`` marks a price that applies to any UOM or
+customer.
+"""
+
+import frappe
+from frappe.utils import nowdate
+
+EFFECTIVE_PRICE_DOCTYPE = "POS Effective Price"
+REBUILD_BATCH_SIZE = 1000
+
+
+def _get_valid_item_prices(item_codes, price_list=None):
+	conditions = ["item_code IN %(item_codes)s"]
+	values = {"item_codes": tuple(item_codes), "today": nowdate()}
+	if price_list:
+		conditions.append("price_list = %(price_list)s")
+		values["price_list"] = price_list
+	return frappe.db.sql(
+		f"""
+		SELECT
+			name, price_list, item_code, IFNULL(uom, '') AS uom,
+			IFNULL(customer, '') AS customer, currency, price_list_rate, valid_upto
+		FROM `tabItem Price`
+		WHERE selling = 1
+		AND (valid_from IS NULL OR valid_from <= %(today)s)
+		AND (valid_upto IS NULL OR valid_upto >= %(today)s)
+		AND {" AND ".join(conditions)}
+		ORDER BY valid_from ASC, modified ASC
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+def refresh_effective_prices(item_codes, price_list=None):
+	"""Recompute the effective prices of ``item_codes``, on ``price_list`` only if given."""
+	item_codes = [code for code in set(item_codes or []) if code]
+	if not item_codes:
+		return
+
+	# Later rows win: latest valid_from, then most recently modified
+	effective = {}
+	for row in _get_valid_item_prices(item_codes, price_list):
+		effective[(row.price_list, row.item_code, row.uom, row.customer, row.currency)] = row
+
+	filters = {"item_code": ["in", item_codes]}
+	if price_list:
+		filters["price_list"] = price_list
+	frappe.db.delete(EFFECTIVE_PRICE_DOCTYPE, filters)
+	if not effective:
+		return
+
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		EFFECTIVE_PRICE_DOCTYPE,
+		fields=[
+			"name",
+			"price_list",
+			"item_code",
+			"uom",
+			"customer",
+			"currency",
+			"price_list_rate",
+			"item_price",
+			"valid_upto",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=12),
+				row.price_list,
+				row.item_code,
+				row.uom,
+				row.customer,
+				row.currency,
+				row.price_list_rate,
+				row.name,
+				row.valid_upto,
+				now,
+				now,
+				"Administrator",
+				"Administrator",
+			)
+			for row in effective.values()
+		],
+		chunk_size=5000,
+	)
+
+
+def rebuild_effective_prices():
+	"""Recompute every effective price; run on the daily long queue so validity windows roll over."""
+	last_name = ""
+	while True:
+		item_codes = frappe.get_all(
+			"Item",
+			filters={"name": [">", last_name]},
+			order_by="name asc",
+			limit_page_length=REBUILD_BATCH_SIZE,
+			pluck="name",
+		)
+		if not item_codes:
+			break
+		refresh_effective_prices(item_codes)
+		frappe.db.commit()
+		last_name = item_codes[-1]
+
+	frappe.db.sql(
+		"""
+		DELETE FROM `tabPOS Effective Price`
+		WHERE NOT EXISTS (SELECT 1 FROM `tabItem` WHERE name = `tabPOS Effective Price`.item_code)
+		"""
+	)
+
+
+def get_effective_prices_map(item_codes, price_list, currency=None, customer=None):
+	"""Return ``{item_code: {uom or "None": row}}`` for ``price_list``.
+
+	Prices specific to ``customer`` take precedence over generic ones.
+	"""
+	item_prices = {}
+	if not item_codes or not price_list:
+		return item_prices
+
+	conditions = ["item_code IN %(item_codes)s", "price_list = %(price_list)s", "customer IN ('', %(customer)s)"]
+	values = {"item_codes": tuple(item_codes), "price_list": price_list, "customer": customer or ""}
+	if currency:
+		conditions.append("currency = %(currency)s")
+		values["currency"] = currency
+
+	for row in frappe.db.sql(
+		f"""
+		SELECT item_code, uom, customer, currency, price_list_rate
+		FROM `tabPOS Effective Price`
+		WHERE {" AND ".join(conditions)}
+		ORDER BY customer ASC
+		""",
+		values,
+		as_dict=True,
+	):
+		item_prices.setdefault(row.item_code, {})[row.uom or "None"] = row
+	return item_prices
+
+
+def get_effective_price(item_code, price_list, uom=None, customer=None, currency=None, any_uom=True):
+	"""Return the effective price row of one item, or ``None``.
+
+	A price for ``uom`` or for any UOM comes first, then one for another
+	UOM; within those a customer specific price beats a generic one, and a
+	price for ``uom`` beats one for any UOM. With ``any_uom=False`` only a
+	price for ``uom`` itself is returned.
+	"""
+	if not item_code or not price_list:
+		return None
+
+	conditions = [
+		"item_code = %(item_code)s",
+		"price_list = %(price_list)s",
+		"customer IN ('', %(customer)s)",
+	]
+	if not any_uom:
+		conditions.append("uom = %(uom)s")
+	values = {"item_code": item_code, "price_list": price_list, "customer": customer or "", "uom": uom or ""}
+	if currency:
+		conditions.append("currency = %(currency)s")
+		values["currency"] = currency
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT item_code, uom, customer, currency, price_list_rate
+		FROM `tabPOS Effective Price`
+		WHERE {" AND ".join(conditions)}
+		ORDER BY uom IN ('', %(uom)s) DESC, customer DESC, uom = %(uom)s DESC, uom ASC
+		LIMIT 1
+		""",
+		values,
+		as_dict=True,
+	)
+	return rows[0] if rows else None
+
+
+def on_item_price_update(doc, method=None):
+	refresh_effective_prices([doc.item_code], doc.price_list)
+	before = doc.get_doc_before_save()
+	if before and (before.item_code, before.price_list) != (doc.item_code, doc.price_list):
+		refresh_effective_prices([before.item_code], before.price_list)
+
+
+def on_item_price_delete(doc, method=None):
+	refresh_effective_prices([doc.item_code], doc.price_list)
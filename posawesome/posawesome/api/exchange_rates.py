@@ -0,0 +1,75 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Date-keyed cache of currency pair exchange rates.
+
+Rates are kept in a Redis hash keyed by pair and date, and memoised on
+``frappe.local`` for the rest of the request, so an invoice with many lines
+resolves each pair once. Saving or deleting a Currency Exchange drops the
+whole hash; the daily scheduler clears it too so past dates do not pile up.
+"""
+
+import frappe
+from frappe.utils import flt, getdate, nowdate
+
+EXCHANGE_RATE_CACHE_KEY = "posa_exchange_rates"
+
+
+def _cached(key, resolve):
+	local = getattr(frappe.local, "posa_exchange_rates", None)
+	if local is None:
+		local = frappe.local.posa_exchange_rates = {}
+	if key in local:
+		return local[key]
+
+	value = frappe.cache().hget(EXCHANGE_RATE_CACHE_KEY, key)
+	if value is None:
+		value = resolve()
+		# Missing rates are not cached so a rate entered later is picked up
+		if value and value[0]:
+			frappe.cache().hset(EXCHANGE_RATE_CACHE_KEY, key, value)
+	local[key] = value
+	return value
+
+
+def get_latest_exchange_rate(from_currency, to_currency):
+	"""Return ``(rate, date)`` from the latest Currency Exchange, else from ERPNext."""
+
+	def resolve():
+		rate_doc = frappe.get_all(
+			"Currency Exchange",
+			filters={"from_currency": from_currency, "to_currency": to_currency},
+			fields=["exchange_rate", "date"],
+			order_by="date desc, creation desc",
+			limit=1,
+		)
+		if rate_doc:
+			return flt(rate_doc[0].exchange_rate), rate_doc[0].date
+		return flt(get_exchange_rate(from_currency, to_currency)), nowdate()
+
+	return _cached(f"latest::{from_currency}::{to_currency}::{nowdate()}", resolve)
+
+
+def get_exchange_rate(from_currency, to_currency, transaction_date=None):
+	"""Cached ``erpnext.setup.utils.get_exchange_rate`` for ``transaction_date``."""
+	if not from_currency or not to_currency or from_currency == to_currency:
+		return 1
+	transaction_date = str(getdate(transaction_date or nowdate()))
+
+	def resolve():
+		from erpnext.setup.utils import get_exchange_rate as erpnext_get_exchange_rate
+
+		return (erpnext_get_exchange_rate(from_currency, to_currency, transaction_date), transaction_date)
+
+	return _cached(f"date::{from_currency}::{to_currency}::{transaction_date}", resolve)[0]
+
+
+def clear_exchange_rate_cache(doc=None, method=None):
+	frappe.local.posa_exchange_rates = {}
+	# After commit, or a concurrent request could cache the old rate again
+	frappe.db.after_commit.add(_clear_exchange_rate_cache)
+
+
+def _clear_exchange_rate_cache():
+	frappe.cache().delete_key(EXCHANGE_RATE_CACHE_KEY)
+	frappe.local.posa_exchange_rates = {}
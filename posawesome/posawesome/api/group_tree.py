@@ -0,0 +1,109 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Cached nested-set subtree resolution for Item Group and Customer Group.
+
+Expanded subtrees are kept both in Redis and in process memory. Entries are
+stamped with a tree version held in Redis; any change to an Item Group,
+Customer Group or POS Profile bumps the version, so every worker drops its
+in-process copy on the next request without a broadcast.
+"""
+
+import frappe
+
+GROUP_TREE_CACHE_KEY = "posa_group_tree"
+GROUP_TREE_VERSION_KEY = "posa_group_tree_version"
+
+# POS Profile child table and link field holding the configured roots
+PROFILE_GROUP_TABLES = {
+	"Item Group": ("POS Item Group", "item_group"),
+	"Customer Group": ("POS Customer Group", "customer_group"),
+}
+
+_local_cache = {}
+
+
+def get_tree_version():
+	"""Return the current tree version, read from Redis once per request."""
+	version = getattr(frappe.local, "posa_group_tree_version", None)
+	if not version:
+		version = frappe.cache().get_value(GROUP_TREE_VERSION_KEY)
+		if not version:
+			version = frappe.generate_hash(length=10)
+			frappe.cache().set_value(GROUP_TREE_VERSION_KEY, version)
+		frappe.local.posa_group_tree_version = version
+	return version
+
+
+def _cached(key, build):
+	version = get_tree_version()
+	local_key = (frappe.local.site, key)
+	cached = _local_cache.get(local_key)
+	if cached and cached[0] == version:
+		return cached[1]
+
+	field = f"{version}::{key}"
+	value = frappe.cache().hget(GROUP_TREE_CACHE_KEY, field)
+	if value is None:
+		value = build()
+		frappe.cache().hset(GROUP_TREE_CACHE_KEY, field, value)
+	_local_cache[local_key] = (version, value)
+	return value
+
+
+def _get_descendants(group_type, roots):
+	if not roots:
+		return []
+	table = f"tab{group_type}"
+	return frappe.db.sql(
+		f"""
+		SELECT DISTINCT child.name, child.lft, child.rgt
+		FROM `{table}` child
+		INNER JOIN `{table}` root ON child.lft >= root.lft AND child.rgt <= root.rgt
+		WHERE root.name IN %(roots)s
+		ORDER BY child.lft
+		""",
+		{"roots": tuple(roots)},
+		as_dict=True,
+	)
+
+
+def get_child_nodes(group_type, root):
+	"""Return ``root`` and its descendants as ``[{name, lft, rgt}]``."""
+	return _cached(f"{group_type}::node::{root}", lambda: _get_descendants(group_type, [root]))
+
+
+def get_profile_groups(pos_profile, group_type):
+	"""Return the names of every ``group_type`` under the roots set on ``pos_profile``.
+
+	An empty list means the profile does not restrict ``group_type``.
+	"""
+	if not pos_profile:
+		return []
+	table, field = PROFILE_GROUP_TABLES[group_type]
+
+	def build():
+		roots = frappe.get_all(
+			table,
+			filters={"parent": pos_profile, "parenttype": "POS Profile"},
+			pluck=field,
+		)
+		return [d.name for d in _get_descendants(group_type, roots)]
+
+	return _cached(f"{group_type}::profile::{pos_profile}", build)
+
+
+def clear_group_tree_cache(doc=None, method=None, *args, **kwargs):
+	"""Invalidate every cached subtree; hooked on group and POS Profile changes.
+
+	Redis is cleared after commit, so a concurrent request cannot cache the
+	old tree under the new version.
+	"""
+	frappe.local.posa_group_tree_version = None
+	frappe.db.after_commit.add(_clear_group_tree_cache)
+
+
+def _clear_group_tree_cache():
+	frappe.cache().delete_key(GROUP_TREE_CACHE_KEY)
+	frappe.cache().set_value(GROUP_TREE_VERSION_KEY, frappe.generate_hash(length=10))
+	frappe.local.posa_group_tree_version = None
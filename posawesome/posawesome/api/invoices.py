@@ -7,7 +7,6 @@ from typing import Dict, List
 import frappe
 from erpnext.accounts.doctype.sales_invoice.sales_invoice import get_bank_cash_account
 from erpnext.selling.doctype.sales_order.sales_order import make_sales_invoice
-from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.batch.batch import (
 	get_batch_no,
 )  # This should be from erpnext directly
@@ -22,21 +21,13 @@ from posawesome.posawesome.api.utilities import (
 	ensure_child_doctype,
 	set_batch_nos_for_bundels,
 )  # Updated imports
+from posawesome.posawesome.api.exchange_rates import get_latest_exchange_rate
+from posawesome.posawesome.api.reference_version import with_content_version
 
 
 def get_latest_rate(from_currency: str, to_currency: str):
 	"""Return the most recent Currency Exchange rate and its date."""
-	rate_doc = frappe.get_all(
-		"Currency Exchange",
-		filters={"from_currency": from_currency, "to_currency": to_currency},
-		fields=["exchange_rate", "date"],
-		order_by="date desc, creation desc",
-		limit=1,
-	)
-	if rate_doc:
-		return flt(rate_doc[0].exchange_rate), rate_doc[0].date
-	rate = get_exchange_rate(from_currency, to_currency, nowdate())
-	return flt(rate), nowdate()
+	return get_latest_exchange_rate(from_currency, to_currency)
 
 
 @frappe.whitelist()
@@ -630,13 +621,18 @@ def update_invoice_from_order(data):
 
 
 @frappe.whitelist()
-def get_available_currencies():
+def get_available_currencies(version=None):
 	"""Get list of available currencies from ERPNext"""
-	return frappe.get_all(
-		"Currency",
-		fields=["name", "currency_name"],
-		filters={"enabled": 1},
-		order_by="currency_name",
+	return with_content_version(
+		["Currency"],
+		[],
+		version,
+		lambda: frappe.get_all(
+			"Currency",
+			fields=["name", "currency_name"],
+			filters={"enabled": 1},
+			order_by="currency_name",
+		),
 	)
 
 
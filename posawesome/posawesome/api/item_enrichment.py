@@ -0,0 +1,552 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Set-based enrichment of item rows.
+
+Every helper in this module takes the item codes of a whole page and answers
+with a single ``IN (...)`` query, returning a mapping keyed by item code. The
+number of queries issued for a page is therefore constant regardless of how
+many items it holds.
+"""
+
+import hashlib
+from collections import defaultdict
+
+import frappe
+from frappe.utils import flt, nowdate
+
+from posawesome.posawesome.api.customer_rates import get_last_customer_rates
+from posawesome.posawesome.api.effective_price import get_effective_prices_map
+from posawesome.posawesome.api.pos_context import get_pos_context
+from posawesome.posawesome.api.thumbnails import get_thumbnail_url
+
+ITEM_FIELDS = [
+	"name as item_code",
+	"item_name",
+	"description",
+	"stock_uom",
+	"image",
+	"is_stock_item",
+	"has_variants",
+	"variant_of",
+	"item_group",
+	"idx",
+	"has_batch_no",
+	"has_serial_no",
+	"max_discount",
+	"brand",
+	"custom_oem_part_number",
+]
+
+# Seconds a page of purchase rates is cached; the list view asks for every row
+PURCHASE_RATE_CACHE_TTL = 30
+
+# Item columns every row needs for enrichment, cursors and ranking
+REQUIRED_ITEM_FIELDS = {
+	"item_code",
+	"item_name",
+	"stock_uom",
+	"has_variants",
+	"variant_of",
+	"has_batch_no",
+	"has_serial_no",
+}
+
+
+def parse_fields(fields):
+	"""Return the requested output fields as a set, or ``None`` for every field.
+
+	``fields`` is a JSON list or comma separated string naming row keys such
+	as ``item_name``, ``rate``, ``item_barcode`` or ``batch_no_data``.
+	"""
+	if not fields:
+		return None
+	if isinstance(fields, str):
+		fields = frappe.parse_json(fields) if fields.lstrip().startswith("[") else fields.split(",")
+	return {f.strip() for f in fields if f and f.strip()} | {"item_code"}
+
+
+def get_item_query_fields(fields=None):
+	"""Return the ``ITEM_FIELDS`` needed to answer ``fields``."""
+	if fields is None:
+		return ITEM_FIELDS
+	wanted = REQUIRED_ITEM_FIELDS | fields
+	if "thumbnail" in fields:
+		wanted = wanted | {"image"}
+	return [f for f in ITEM_FIELDS if f.split(" as ")[-1] in wanted]
+
+
+def project_row(row, fields=None):
+	"""Return ``row`` limited to ``fields``."""
+	if fields is None:
+		return row
+	return {key: value for key, value in row.items() if key in fields}
+
+
+def get_barcodes_map(item_codes):
+	"""Return ``{item_code: [{barcode, posa_uom}]}``."""
+	barcodes = defaultdict(list)
+	if not item_codes:
+		return barcodes
+
+	rows = frappe.get_all(
+		"Item Barcode",
+		filters={"parent": ["in", item_codes], "parenttype": "Item"},
+		fields=["parent", "barcode", "posa_uom"],
+		order_by="idx asc",
+	)
+	for row in rows:
+		barcodes[row.parent].append(frappe._dict({"barcode": row.barcode, "posa_uom": row.posa_uom}))
+	return barcodes
+
+
+def get_uoms_map(item_codes):
+	"""Return ``{item_code: [{uom, conversion_factor}]}``."""
+	uoms = defaultdict(list)
+	if not item_codes:
+		return uoms
+
+	rows = frappe.get_all(
+		"UOM Conversion Detail",
+		filters={"parent": ["in", item_codes], "parenttype": "Item"},
+		fields=["parent", "uom", "conversion_factor"],
+		order_by="idx asc",
+	)
+	for row in rows:
+		uoms[row.parent].append(frappe._dict({"uom": row.uom, "conversion_factor": row.conversion_factor}))
+	return uoms
+
+
+def with_stock_uom(uoms, stock_uom):
+	"""Return ``uoms`` with the stock UOM appended when it is missing."""
+	uoms = list(uoms or [])
+	if stock_uom and not any(u.get("uom") == stock_uom for u in uoms):
+		uoms.append({"uom": stock_uom, "conversion_factor": 1.0})
+	return uoms
+
+
+def get_uom_prices(uoms, prices):
+	"""Return ``{uom: {conversion_factor, price_list_rate}}`` for one item.
+
+	``uoms`` are the item's UOMs including the stock UOM and ``prices`` its
+	``{uom or "None": price row}`` from ``get_item_prices_map``. A UOM
+	without its own Item Price gets ``None``, in which case the client scales
+	the stock UOM rate by the conversion factor.
+	"""
+	matrix = {}
+	for row in uoms:
+		price = (prices or {}).get(row.get("uom"))
+		matrix[row.get("uom")] = {
+			"conversion_factor": flt(row.get("conversion_factor")) or 1.0,
+			"price_list_rate": flt(price.get("price_list_rate")) if price else None,
+		}
+	return matrix
+
+
+def get_serial_counts_map(item_codes, warehouse):
+	"""Return ``{item_code: count}`` of Active serials in ``warehouse``.
+
+	Payloads carry only the count; the serials themselves are paged through
+	``serial_nos.search_serial_nos``.
+	"""
+	if not item_codes or not warehouse:
+		return {}
+
+	rows = frappe.db.sql(
+		"""
+		SELECT item_code, COUNT(*)
+		FROM `tabSerial No`
+		WHERE item_code IN %(item_codes)s
+		AND warehouse = %(warehouse)s
+		AND status = 'Active'
+		GROUP BY item_code
+		""",
+		{"item_codes": tuple(set(item_codes)), "warehouse": warehouse},
+	)
+	return {item_code: count for item_code, count in rows}
+
+
+def get_bin_stock_map(item_codes, warehouse):
+	"""Return ``{item_code: {actual_qty, reserved_qty, projected_qty}}`` from ``Bin``.
+
+	ERPNext keeps one Bin row per item and warehouse up to date with every
+	stock transaction, so current quantities are a primary key lookup instead
+	of a scan for the latest ledger entry. Items without a Bin have no stock.
+	"""
+	if not item_codes or not warehouse:
+		return {}
+
+	rows = frappe.db.sql(
+		"""
+		SELECT item_code, actual_qty, reserved_qty, projected_qty
+		FROM `tabBin`
+		WHERE item_code IN %(item_codes)s
+		AND warehouse = %(warehouse)s
+		""",
+		{"item_codes": tuple(set(item_codes)), "warehouse": warehouse},
+		as_dict=True,
+	)
+	return {
+		row.item_code: frappe._dict(
+			actual_qty=flt(row.actual_qty),
+			reserved_qty=flt(row.reserved_qty),
+			projected_qty=flt(row.projected_qty),
+		)
+		for row in rows
+	}
+
+
+def get_stock_qty_map(item_codes, warehouse):
+	"""Return ``{item_code: actual_qty}`` in ``warehouse``."""
+	return {code: row.actual_qty for code, row in get_bin_stock_map(item_codes, warehouse).items()}
+
+
+def get_batch_data_map(item_codes, warehouse):
+	"""Return ``{item_code: [batch rows]}`` of sellable batches in ``warehouse``.
+
+	Quantities are summed from both Serial and Batch Bundle entries and legacy
+	``batch_no`` ledger rows, mirroring ERPNext's ``get_batch_qty``. Only
+	enabled, unexpired batches with stock are returned, earliest expiry first.
+	"""
+	batches = defaultdict(list)
+	if not item_codes or not warehouse:
+		return batches
+
+	rows = frappe.db.sql(
+		"""
+		SELECT
+			t.item_code,
+			t.batch_no,
+			SUM(t.qty) AS qty,
+			b.expiry_date,
+			b.posa_batch_price,
+			b.manufacturing_date
+		FROM (
+			SELECT sle.item_code, sbe.batch_no, sbe.qty
+			FROM `tabStock Ledger Entry` sle
+			INNER JOIN `tabSerial and Batch Entry` sbe ON sbe.parent = sle.serial_and_batch_bundle
+			WHERE sle.item_code IN %(item_codes)s
+			AND sle.warehouse = %(warehouse)s
+			AND sle.is_cancelled = 0
+			AND IFNULL(sbe.batch_no, '') != ''
+			UNION ALL
+			SELECT sle.item_code, sle.batch_no, sle.actual_qty AS qty
+			FROM `tabStock Ledger Entry` sle
+			WHERE sle.item_code IN %(item_codes)s
+			AND sle.warehouse = %(warehouse)s
+			AND sle.is_cancelled = 0
+			AND IFNULL(sle.batch_no, '') != ''
+			AND IFNULL(sle.serial_and_batch_bundle, '') = ''
+		) t
+		INNER JOIN `tabBatch` b ON b.name = t.batch_no
+		WHERE b.disabled = 0
+		AND (b.expiry_date IS NULL OR b.expiry_date > %(today)s)
+		GROUP BY t.item_code, t.batch_no, b.expiry_date, b.posa_batch_price, b.manufacturing_date
+		HAVING qty > 0
+		ORDER BY t.item_code, b.expiry_date IS NULL, b.expiry_date, t.batch_no
+		""",
+		{"item_codes": tuple(set(item_codes)), "warehouse": warehouse, "today": nowdate()},
+		as_dict=True,
+	)
+	for row in rows:
+		batches[row.item_code].append(
+			{
+				"batch_no": row.batch_no,
+				"batch_qty": row.qty,
+				"expiry_date": row.expiry_date,
+				"batch_price": row.posa_batch_price,
+				"manufacturing_date": row.manufacturing_date,
+			}
+		)
+	return batches
+
+
+def get_purchase_rates_map(item_codes, warehouses=None, cache_ttl=PURCHASE_RATE_CACHE_TTL):
+	"""Return ``{item_code: {valuation_rate, last_purchase_rate, warehouses}}`` in one query.
+
+	``warehouses`` maps each Bin warehouse to its valuation rate, and
+	``valuation_rate`` is that of the most recently updated Bin among
+	``warehouses`` (every warehouse when not given). ``last_purchase_rate``
+	is the rate ERPNext keeps on the Item. Results are cached for
+	``cache_ttl`` seconds; pass 0 to bypass the cache.
+	"""
+	if not item_codes:
+		return {}
+	item_codes = sorted(set(item_codes))
+	if isinstance(warehouses, str):
+		warehouses = [warehouses]
+	warehouses = sorted(set(warehouses or []))
+
+	cache_key = None
+	if cache_ttl:
+		digest = hashlib.sha1(frappe.as_json([item_codes, warehouses], indent=None).encode()).hexdigest()
+		cache_key = f"posa_purchase_rates::{digest}"
+		cached = frappe.cache().get_value(cache_key)
+		if cached is not None:
+			return cached
+
+	bin_condition = "AND bin.warehouse IN %(warehouses)s" if warehouses else ""
+	rates = {}
+	for row in frappe.db.sql(
+		f"""
+		SELECT item.name AS item_code, item.last_purchase_rate, bin.warehouse, bin.valuation_rate
+		FROM `tabItem` item
+		LEFT JOIN `tabBin` bin ON bin.item_code = item.name {bin_condition}
+		WHERE item.name IN %(item_codes)s
+		ORDER BY bin.modified DESC
+		""",
+		{"item_codes": tuple(item_codes), "warehouses": tuple(warehouses)},
+		as_dict=True,
+	):
+		rate = rates.setdefault(
+			row.item_code,
+			{
+				"valuation_rate": row.valuation_rate or 0,
+				"last_purchase_rate": row.last_purchase_rate or 0,
+				"warehouses": {},
+			},
+		)
+		if row.warehouse:
+			rate["warehouses"][row.warehouse] = row.valuation_rate or 0
+
+	if cache_key:
+		frappe.cache().set_value(cache_key, rates, expires_in_sec=cache_ttl)
+	return rates
+
+
+def get_last_purchase_rates_map(item_codes, warehouse=None):
+	"""Return ``{item_code: valuation_rate}`` from the Bin table."""
+	return {
+		item_code: rate["valuation_rate"]
+		for item_code, rate in get_purchase_rates_map(item_codes, warehouse).items()
+	}
+
+
+def get_last_customer_rates_map(item_codes, customer, price_list=None):
+	"""Return ``{item_code: rate}`` last sold to ``customer``.
+
+	Items never invoiced to the customer fall back to a customer specific
+	Item Price on ``price_list``.
+	"""
+	if not item_codes or not customer:
+		return {}
+
+	rates = get_last_customer_rates(item_codes, customer)
+
+	missing = [code for code in item_codes if code not in rates]
+	if missing and price_list:
+		for row in frappe.get_all(
+			"Item Price",
+			filters={
+				"item_code": ["in", missing],
+				"price_list": price_list,
+				"customer": customer,
+				"selling": 1,
+			},
+			fields=["item_code", "price_list_rate"],
+			order_by="valid_from desc",
+		):
+			rates.setdefault(row.item_code, row.price_list_rate or 0)
+	return rates
+
+
+def get_template_attributes_map(template_codes):
+	"""Return ``{template: [{name, attribute_name}]}`` of Item Attributes."""
+	attributes = defaultdict(list)
+	if not template_codes:
+		return attributes
+
+	links = frappe.get_all(
+		"Item Variant Attribute",
+		filters={"parent": ["in", template_codes]},
+		fields=["parent", "attribute"],
+	)
+	if not links:
+		return attributes
+
+	attribute_docs = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item Attribute",
+			filters={"name": ["in", list({d.attribute for d in links})]},
+			fields=["name", "attribute_name"],
+		)
+	}
+	for link in links:
+		if link.attribute in attribute_docs and attribute_docs[link.attribute] not in attributes[link.parent]:
+			attributes[link.parent].append(attribute_docs[link.attribute])
+	return attributes
+
+
+def get_variant_attributes_map(variant_codes):
+	"""Return ``{variant: [{attribute, attribute_value}]}``."""
+	attributes = defaultdict(list)
+	if not variant_codes:
+		return attributes
+
+	for row in frappe.get_all(
+		"Item Variant Attribute",
+		filters={"parent": ["in", variant_codes], "parentfield": "attributes"},
+		fields=["parent", "attribute", "attribute_value"],
+		order_by="idx asc",
+	):
+		attributes[row.parent].append(
+			frappe._dict({"attribute": row.attribute, "attribute_value": row.attribute_value})
+		)
+	return attributes
+
+
+def get_item_prices_map(item_codes, price_list, currency, customer=None):
+	"""Return ``{item_code: {uom or "None": price row}}`` valid today."""
+	return get_effective_prices_map(item_codes, price_list, currency, customer)
+
+
+def get_pricing_rule_item_codes(items, company=None):
+	"""Return the codes in ``items`` targeted by an active selling Pricing Rule.
+
+	``items`` are rows carrying ``item_code``, ``item_group``, ``brand`` and
+	``variant_of``. Rules on an item group also cover its descendant groups,
+	and rules on a template also cover its variants.
+	"""
+	if not items:
+		return set()
+
+	today = nowdate()
+	rules = frappe.db.sql_list(
+		"""
+		SELECT name FROM `tabPricing Rule`
+		WHERE disable = 0
+		AND selling = 1
+		AND apply_on IN ('Item Code', 'Item Group', 'Brand')
+		AND IFNULL(company, '') IN ('', %(company)s)
+		AND (valid_from IS NULL OR valid_from <= %(today)s)
+		AND (valid_upto IS NULL OR valid_upto >= %(today)s)
+		""",
+		{"company": company or "", "today": today},
+	)
+	if not rules:
+		return set()
+
+	rule_items = set(
+		frappe.get_all("Pricing Rule Item Code", filters={"parent": ["in", rules]}, pluck="item_code")
+	)
+	rule_brands = set(frappe.get_all("Pricing Rule Brand", filters={"parent": ["in", rules]}, pluck="brand"))
+	rule_groups = frappe.get_all("Pricing Rule Item Group", filters={"parent": ["in", rules]}, pluck="item_group")
+
+	covered_groups = set()
+	if rule_groups:
+		covered_groups = set(
+			frappe.db.sql_list(
+				"""
+				SELECT DISTINCT child.name
+				FROM `tabItem Group` child
+				INNER JOIN `tabItem Group` parent
+					ON child.lft >= parent.lft AND child.rgt <= parent.rgt
+				WHERE parent.name IN %(groups)s
+				""",
+				{"groups": tuple(rule_groups)},
+			)
+		)
+
+	return {
+		item.item_code
+		for item in items
+		if item.item_code in rule_items
+		or (item.variant_of and item.variant_of in rule_items)
+		or (item.brand and item.brand in rule_brands)
+		or item.item_group in covered_groups
+	}
+
+
+def enrich_items(items_data, pos_profile, price_list, customer=None, use_limit_search=False, fields=None):
+	"""Assemble the ``get_items`` payload for ``items_data`` in a fixed number of queries.
+
+	When ``fields`` is given (see ``parse_fields``) only those keys are returned
+	and the queries behind unrequested sub-collections are skipped.
+	"""
+	if not items_data:
+		return []
+
+	def wants(*keys):
+		return fields is None or any(key in fields for key in keys)
+
+	warehouse = pos_profile.get("warehouse")
+	search_serial_no = pos_profile.get("posa_search_serial_no")
+	search_batch_no = pos_profile.get("posa_search_batch_no")
+	show_template_items = pos_profile.get("posa_show_template_items")
+	display_items_in_stock = pos_profile.get("posa_display_items_in_stock")
+	show_purchase_rate = pos_profile.get("show_last_purchase_rate_in_list") or pos_profile.get(
+		"show_last_purchase_rate_in_cart"
+	)
+	show_customer_rate = pos_profile.get("custom_show_last_custom_rate")
+
+	item_codes = [d.item_code for d in items_data]
+	batch_codes = [d.item_code for d in items_data if search_batch_no or d.has_batch_no]
+	serial_codes = [d.item_code for d in items_data if search_serial_no or d.has_serial_no]
+
+	price_list_currency = get_pos_context(pos_profile).get_price_list_currency(price_list)
+	item_prices = {}
+	if wants("rate", "currency", "uom_prices"):
+		item_prices = get_item_prices_map(
+			item_codes, price_list, price_list_currency or pos_profile.get("currency"), customer
+		)
+	barcodes = get_barcodes_map(item_codes) if wants("item_barcode") else {}
+	uoms = get_uoms_map(item_codes) if wants("item_uoms", "uom_prices") else {}
+	batches = get_batch_data_map(batch_codes, warehouse) if wants("batch_no_data") else {}
+	serials = get_serial_counts_map(serial_codes, warehouse) if wants("serial_no_count") else {}
+	stock_qty = {}
+	if display_items_in_stock or (use_limit_search and wants("actual_qty")):
+		stock_qty = get_stock_qty_map(item_codes, warehouse)
+
+	template_attributes = {}
+	variant_attributes = {}
+	if show_template_items:
+		if wants("attributes"):
+			template_attributes = get_template_attributes_map([d.item_code for d in items_data if d.has_variants])
+		if wants("item_attributes"):
+			variant_attributes = get_variant_attributes_map([d.item_code for d in items_data if d.variant_of])
+
+	result = []
+	visible = []
+	for item in items_data:
+		item_stock_qty = stock_qty.get(item.item_code, 0.0)
+		if display_items_in_stock and (not item_stock_qty or item_stock_qty < 0):
+			continue
+		visible.append((item, item_stock_qty))
+
+	visible_codes = [item.item_code for item, _qty in visible]
+	purchase_rates = {}
+	if show_purchase_rate and wants("last_purchase_rate"):
+		purchase_rates = get_last_purchase_rates_map(visible_codes, warehouse)
+	customer_rates = {}
+	if show_customer_rate and customer and wants("last_customer_rate"):
+		customer_rates = get_last_customer_rates_map(visible_codes, customer, price_list)
+
+	for item, item_stock_qty in visible:
+		item_code = item.item_code
+		item_price = {}
+		if item_prices.get(item_code):
+			item_price = item_prices[item_code].get(item.stock_uom) or item_prices[item_code].get("None") or {}
+
+		item_uoms = with_stock_uom(uoms.get(item_code), item.stock_uom)
+		row = {}
+		row.update(item)
+		row.update(
+			{
+				"rate": item_price.get("price_list_rate") or 0,
+				"currency": item_price.get("currency") or price_list_currency or pos_profile.get("currency"),
+				"item_barcode": barcodes.get(item_code) or [],
+				"actual_qty": item_stock_qty or 0,
+				"serial_no_count": serials.get(item_code, 0),
+				"batch_no_data": batches.get(item_code) or [],
+				"attributes": template_attributes.get(item_code) or "",
+				"item_attributes": variant_attributes.get(item_code) or "",
+				"item_uoms": item_uoms,
+				"uom_prices": get_uom_prices(item_uoms, item_prices.get(item_code)) if wants("uom_prices") else None,
+				"thumbnail": get_thumbnail_url(item.get("image")) if wants("thumbnail") else None,
+				"last_purchase_rate": purchase_rates.get(item_code, 0),
+				"last_customer_rate": customer_rates.get(item_code, 0),
+			}
+		)
+		result.append(project_row(row, fields))
+	return result
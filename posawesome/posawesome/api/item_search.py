@@ -0,0 +1,318 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Prefix token search index for POS item lookups.
+
+Item code, item name, OEM part number, brand and barcodes are split into
+words and every word prefix (``MIN_TOKEN_LENGTH`` to ``MAX_TOKEN_LENGTH``
+characters) is stored in ``POS Item Search Token`` with a weight reflecting
+the field it came from. A search turns into indexed equality lookups on the
+tokens of the search term, ranked by the summed weights in SQL.
+"""
+
+import re
+
+import frappe
+from frappe.utils.background_jobs import enqueue
+
+from posawesome.posawesome.api.group_tree import get_profile_groups
+from posawesome.posawesome.api.item_enrichment import get_barcodes_map
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 20
+INDEX_BATCH_SIZE = 1000
+TOKEN_DOCTYPE = "POS Item Search Token"
+REBUILD_TIMEOUT = 7200
+# Set while the index is rebuilt so searches use LIKE scans on the partial index
+REBUILDING_KEY = "posa_item_search_rebuilding"
+
+# (prefix weight, whole word weight) per indexed field
+FIELD_WEIGHTS = {
+	"item_code": (60, 100),
+	"barcode": (50, 90),
+	"custom_oem_part_number": (40, 70),
+	"item_name": (30, 45),
+	"brand": (10, 15),
+}
+
+_WORD_SPLIT = re.compile(r"[^\w]+", re.UNICODE)
+
+# Bin has one row per item and warehouse, so the join never duplicates items
+STOCK_JOIN = (
+	"INNER JOIN `tabBin` bin ON bin.item_code = {alias}.{key} "
+	"AND bin.warehouse = %(warehouse)s AND bin.actual_qty > 0"
+)
+
+
+def normalize(value):
+	return (value or "").strip().lower()
+
+
+def split_words(value):
+	return [w for w in _WORD_SPLIT.split(normalize(value)) if w]
+
+
+def get_search_tokens(search_value):
+	"""Return the distinct index tokens a search term must match."""
+	tokens = []
+	for word in split_words(search_value):
+		token = word[:MAX_TOKEN_LENGTH]
+		if len(token) >= MIN_TOKEN_LENGTH and token not in tokens:
+			tokens.append(token)
+	return tokens
+
+
+def build_item_tokens(item, barcodes=None):
+	"""Return ``{token: weight}`` for an item row."""
+	tokens = {}
+
+	def add(value, field, whole_value=False):
+		prefix_weight, word_weight = FIELD_WEIGHTS[field]
+		words = split_words(value)
+		if whole_value:
+			# Codes and barcodes are also indexed with separators removed so
+			# that "abc12" matches "ABC-123".
+			whole = "".join(words)
+			if whole and whole not in words:
+				words.append(whole)
+		for word in words:
+			for length in range(MIN_TOKEN_LENGTH, min(len(word), MAX_TOKEN_LENGTH) + 1):
+				token = word[:length]
+				weight = word_weight if length == len(word) else prefix_weight
+				if tokens.get(token, 0) < weight:
+					tokens[token] = weight
+
+	add(item.get("item_code") or item.get("name"), "item_code", whole_value=True)
+	add(item.get("item_name"), "item_name")
+	add(item.get("custom_oem_part_number"), "custom_oem_part_number", whole_value=True)
+	add(item.get("brand"), "brand")
+	for barcode in barcodes or []:
+		add(barcode.get("barcode"), "barcode", whole_value=True)
+	return tokens
+
+
+def _insert_tokens(rows):
+	if not rows:
+		return
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		TOKEN_DOCTYPE,
+		fields=["name", "item_code", "token", "weight", "creation", "modified", "owner", "modified_by"],
+		values=[
+			(frappe.generate_hash(length=12), item_code, token, weight, now, now, "Administrator", "Administrator")
+			for item_code, token, weight in rows
+		],
+		chunk_size=5000,
+	)
+
+
+def index_items(item_codes):
+	"""Rebuild the tokens of ``item_codes`` in a fixed number of queries."""
+	if not item_codes:
+		return
+	items = frappe.get_all(
+		"Item",
+		filters={"name": ["in", item_codes]},
+		fields=["name as item_code", "item_name", "brand", "custom_oem_part_number"],
+	)
+	barcodes = get_barcodes_map(item_codes)
+
+	frappe.db.delete(TOKEN_DOCTYPE, {"item_code": ["in", item_codes]})
+	rows = []
+	for item in items:
+		for token, weight in build_item_tokens(item, barcodes.get(item.item_code)).items():
+			rows.append((item.item_code, token, weight))
+	_insert_tokens(rows)
+
+
+def rebuild_item_search_index():
+	"""Rebuild the whole search index; run as a background job."""
+	frappe.cache().set_value(REBUILDING_KEY, 1, expires_in_sec=REBUILD_TIMEOUT)
+	try:
+		frappe.db.truncate(TOKEN_DOCTYPE)
+		last_name = ""
+		while True:
+			item_codes = frappe.get_all(
+				"Item",
+				filters={"name": [">", last_name]},
+				order_by="name asc",
+				limit_page_length=INDEX_BATCH_SIZE,
+				pluck="name",
+			)
+			if not item_codes:
+				break
+			index_items(item_codes)
+			frappe.db.commit()
+			last_name = item_codes[-1]
+	finally:
+		frappe.cache().delete_value(REBUILDING_KEY)
+
+
+def enqueue_rebuild_item_search_index():
+	enqueue(
+		method=rebuild_item_search_index,
+		queue="long",
+		timeout=REBUILD_TIMEOUT,
+		job_id="pos_item_search_index_rebuild",
+		deduplicate=True,
+	)
+
+
+def is_index_ready():
+	if frappe.cache().get_value(REBUILDING_KEY):
+		return False
+	return bool(frappe.db.sql(f"SELECT name FROM `tab{TOKEN_DOCTYPE}` LIMIT 1"))
+
+
+def search_item_codes(
+	search_value,
+	item_groups=None,
+	item_group_like=None,
+	include_templates=False,
+	limit=None,
+	in_stock_warehouse=None,
+):
+	"""Return item codes matching every token of ``search_value``, best first.
+
+	With ``in_stock_warehouse`` only items with positive stock there are
+	returned, so ``limit`` counts in-stock items. Returns ``None`` when the
+	index cannot serve the term (too short, or the index is not built or is
+	being rebuilt) so callers can fall back to LIKE scans.
+	"""
+	tokens = get_search_tokens(search_value)
+	if not tokens or not is_index_ready():
+		return None
+
+	conditions = ["item.disabled = 0", "item.is_sales_item = 1", "item.is_fixed_asset = 0"]
+	values = {"tokens": tuple(tokens), "token_count": len(tokens)}
+	if not include_templates:
+		conditions.append("item.has_variants = 0")
+	if item_groups:
+		conditions.append("item.item_group IN %(item_groups)s")
+		values["item_groups"] = tuple(item_groups)
+	if item_group_like:
+		conditions.append("item.item_group LIKE %(item_group_like)s")
+		values["item_group_like"] = f"%{item_group_like}%"
+
+	stock_join = ""
+	if in_stock_warehouse:
+		stock_join = STOCK_JOIN.format(alias="item", key="name")
+		values["warehouse"] = in_stock_warehouse
+
+	limit_clause = ""
+	if limit:
+		limit_clause = "LIMIT %(limit)s"
+		values["limit"] = int(limit)
+
+	return frappe.db.sql_list(
+		f"""
+		SELECT t.item_code
+		FROM `tab{TOKEN_DOCTYPE}` t
+		INNER JOIN `tabItem` item ON item.name = t.item_code
+		{stock_join}
+		WHERE t.token IN %(tokens)s
+		AND {" AND ".join(conditions)}
+		GROUP BY t.item_code, item.item_name
+		HAVING COUNT(*) = %(token_count)s
+		ORDER BY SUM(t.weight) DESC, item.item_name ASC, t.item_code ASC
+		{limit_clause}
+		""",
+		values,
+	)
+
+
+def _escape_like(value):
+	return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def query_items(
+	filters,
+	or_filters=None,
+	fields=None,
+	limit_start=None,
+	limit_page_length=None,
+	search_value=None,
+	in_stock_warehouse=None,
+):
+	"""Return Item rows for ``filters`` with stock filtering and ranking done before LIMIT.
+
+	With ``in_stock_warehouse`` only items with positive stock there are kept.
+	With ``search_value`` rows are ranked exact item code, item code prefix,
+	item name prefix, then anything else; ties are ordered by item name and
+	code. ``fields`` must select ``item_code`` and ``item_name``.
+	"""
+	query = frappe.get_all(
+		"Item",
+		filters=filters,
+		or_filters=or_filters or None,
+		fields=fields,
+		order_by="item_name asc",
+		run=0,
+	)
+	values = {}
+	stock_join = ""
+	if in_stock_warehouse:
+		stock_join = STOCK_JOIN.format(alias="item", key="item_code")
+		values["warehouse"] = in_stock_warehouse
+
+	order_by = "item.item_name ASC, item.item_code ASC"
+	if search_value:
+		values["term"] = search_value
+		values["prefix"] = _escape_like(search_value) + "%"
+		order_by = f"""CASE
+			WHEN item.item_code = %(term)s THEN 0
+			WHEN item.item_code LIKE %(prefix)s THEN 1
+			WHEN item.item_name LIKE %(prefix)s THEN 2
+			ELSE 3
+		END, {order_by}"""
+
+	limit_clause = ""
+	if limit_page_length:
+		limit_clause = "LIMIT %(limit_start)s, %(limit_page_length)s"
+		values.update({"limit_start": int(limit_start or 0), "limit_page_length": int(limit_page_length)})
+
+	# The inner query carries its LIKE patterns inline; keep them out of
+	# parameter substitution.
+	return frappe.db.sql(
+		f"""
+		SELECT item.*
+		FROM ({query.replace("%", "%%")}) item
+		{stock_join}
+		ORDER BY {order_by}
+		{limit_clause}
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+@frappe.whitelist()
+def search_items(search_value, pos_profile=None, limit=20):
+	"""Return ranked item codes for ``search_value``."""
+	item_groups = None
+	include_templates = False
+	if pos_profile:
+		profile_name = pos_profile
+		if pos_profile.startswith("{"):
+			profile_name = frappe.parse_json(pos_profile).get("name")
+		item_groups = get_profile_groups(profile_name, "Item Group")
+		include_templates = bool(frappe.get_cached_value("POS Profile", profile_name, "posa_show_template_items"))
+	return search_item_codes(
+		search_value,
+		item_groups=item_groups,
+		include_templates=include_templates,
+		limit=min(int(limit or 20), 500),
+	) or []
+
+
+def on_item_update(doc, method=None):
+	index_items([doc.name])
+
+
+def on_item_trash(doc, method=None):
+	frappe.db.delete(TOKEN_DOCTYPE, {"item_code": doc.name})
+
+
+def on_item_rename(doc, method=None, old=None, new=None, merge=False):
+	frappe.db.delete(TOKEN_DOCTYPE, {"item_code": old})
+	index_items([new or doc.name])
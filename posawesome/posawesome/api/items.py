@@ -2,19 +2,54 @@
 # For license information, please see license.txt
 
 import json
+import math
 
 import frappe
-from erpnext.accounts.doctype.pos_profile.pos_profile import get_item_groups
-from erpnext.stock.doctype.batch.batch import (
-	get_batch_no,
-	get_batch_qty,
-)
+from erpnext.stock.doctype.batch.batch import get_batch_no
 from erpnext.stock.get_item_details import get_item_details
 from frappe import _
 from frappe.utils import cstr, flt, nowdate
 from frappe.utils.background_jobs import enqueue
 from frappe.utils.caching import redis_cache
 
+from posawesome.posawesome.api.barcode_index import resolve_code
+from posawesome.posawesome.api.catalog_snapshot import enqueue_price_list_snapshots
+from posawesome.posawesome.api.columnar import to_wire_format
+from posawesome.posawesome.api.customer_rates import get_last_customer_rates
+from posawesome.posawesome.api.effective_price import (
+	get_effective_price,
+	get_effective_prices_map,
+	refresh_effective_prices,
+)
+from posawesome.posawesome.api.item_enrichment import (
+	ITEM_FIELDS,
+	enrich_items,
+	get_barcodes_map,
+	get_batch_data_map,
+	get_bin_stock_map,
+	get_item_prices_map,
+	get_item_query_fields,
+	get_last_purchase_rates_map,
+	get_pricing_rule_item_codes,
+	get_serial_counts_map,
+	get_stock_qty_map,
+	get_uom_prices,
+	get_uoms_map,
+	parse_fields,
+	project_row,
+	with_stock_uom,
+)
+from posawesome.posawesome.api.item_search import query_items, search_item_codes
+from posawesome.posawesome.api.pos_context import get_pos_context
+from posawesome.posawesome.api.reference_version import clear_reference_version, with_content_version
+from posawesome.posawesome.api.serial_nos import search_serial_nos
+from posawesome.posawesome.api.thumbnails import get_thumbnail_url
+from posawesome.posawesome.api.utils import decode_cursor, encode_cursor
+from posawesome.posawesome.api.variant_matrix import build_variant_matrix, get_variant_matrix
+
+DEFAULT_CURSOR_PAGE_SIZE = 500
+MAX_BULK_PRICE_ROWS = 10000
+
 
 def get_seearch_items_conditions(item_code, serial_no, batch_no, barcode):
 	"""Build item search conditions safely."""
@@ -31,7 +66,7 @@ def get_seearch_items_conditions(item_code, serial_no, batch_no, barcode):
 
 def get_item_group_condition(pos_profile):
 	cond = " and 1=1"
-	item_groups = get_item_groups(pos_profile)
+	item_groups = get_pos_context(pos_profile).escaped_item_groups
 	if item_groups:
 		cond = " and item_group in ({})".format(", ".join(["%s"] * len(item_groups)))
 
@@ -41,14 +76,7 @@ def get_item_group_condition(pos_profile):
 def get_last_purchase_rate(item_code, warehouse=None):
 	"""Get the last purchase rate (valuation rate) from BIN for an item."""
 	try:
-		# Get valuation rate from BIN
-		bin_data = frappe.db.get_value(
-			"Bin",
-			{"item_code": item_code, "warehouse": warehouse} if warehouse else {"item_code": item_code},
-			["valuation_rate"],
-			order_by="modified desc"
-		)
-		return bin_data or 0
+		return get_last_purchase_rates_map([item_code], warehouse).get(item_code) or 0
 	except Exception:
 		return 0
 
@@ -56,20 +84,11 @@ def get_last_purchase_rate(item_code, warehouse=None):
 def get_last_customer_rate(item_code, customer, price_list=None):
 	"""Get the last selling rate given to a specific customer for an item."""
 	try:
-		# Get the last rate from Sales Invoice Item for this customer
-		customer_rate = frappe.db.sql("""
-			SELECT rate 
-			FROM `tabSales Invoice Item` sii
-			INNER JOIN `tabSales Invoice` si ON sii.parent = si.name
-			WHERE sii.item_code = %s 
-			AND si.customer = %s 
-			AND si.docstatus = 1
-			ORDER BY si.posting_date DESC, si.creation DESC
-			LIMIT 1
-		""", (item_code, customer), as_dict=True)
+		# Get the last rate invoiced to this customer from the maintained index
+		customer_rate = get_last_customer_rates([item_code], customer)
 		
-		if customer_rate:
-			return customer_rate[0].rate
+		if item_code in customer_rate:
+			return customer_rate[item_code]
 			
 		# Fallback: Get customer-specific item price
 		if price_list:
@@ -92,30 +111,8 @@ def get_last_customer_rate(item_code, customer, price_list=None):
 
 
 def get_stock_availability(item_code, warehouse):
-	"""Get the latest stock quantity for an item in a specific warehouse."""
-	try:
-		# Use SQL query to get the latest stock ledger entry
-		result = frappe.db.sql("""
-			SELECT qty_after_transaction 
-			FROM `tabStock Ledger Entry` 
-			WHERE item_code = %s 
-			AND warehouse = %s 
-			AND is_cancelled = 0
-			ORDER BY posting_date DESC, posting_time DESC, creation DESC
-			LIMIT 1
-		""", (item_code, warehouse))
-		
-		if result and len(result) > 0:
-			actual_qty = flt(result[0][0] or 0.0)
-		else:
-			actual_qty = 0.0
-			
-		frappe.logger().debug(f"Stock availability for {item_code} in {warehouse}: {actual_qty}")
-		return actual_qty
-		
-	except Exception as e:
-		frappe.logger().error(f"Error getting stock availability for {item_code} in {warehouse}: {str(e)}")
-		return 0.0
+	"""Get the current stock quantity for an item in a specific warehouse."""
+	return get_stock_qty_map([item_code], warehouse).get(item_code, 0.0)
 
 
 @frappe.whitelist()
@@ -128,8 +125,11 @@ def get_items(
 	limit=None,
 	offset=None,
 	modified_after=None,
+	cursor=None,
+	fields=None,
+	wire_format=None,
 ):
-	_pos_profile = json.loads(pos_profile)
+	_pos_profile = get_pos_context(pos_profile)
 	use_price_list = _pos_profile.get("posa_use_server_cache")
 
 	@redis_cache(ttl=60)
@@ -142,6 +142,8 @@ def get_items(
 		limit=None,
 		offset=None,
 		modified_after=None,
+		cursor=None,
+		fields=None,
 	):
 		return _get_items(
 		        pos_profile,
@@ -152,6 +154,8 @@ def get_items(
 		        limit,
 		        offset,
 		        modified_after,
+		        cursor,
+		        fields,
 		)
 
 	def _get_items(
@@ -163,8 +167,11 @@ def get_items(
 		limit=None,
 		offset=None,
 		modified_after=None,
+		cursor=None,
+		fields=None,
 	):
-		pos_profile = json.loads(pos_profile)
+		pos_profile = get_pos_context(pos_profile)
+		fields = parse_fields(fields)
 		condition = ""
 
 		# Clear quantity cache to ensure fresh values on each search
@@ -206,7 +213,7 @@ def get_items(
 			if offset:
 				limit_clause += f" OFFSET {offset}"
 
-		condition += get_item_group_condition(pos_profile.get("name"))
+		condition += get_item_group_condition(pos_profile)
 
 		if use_limit_search and limit is None:
 			search_limit = pos_profile.get("posa_search_limit") or 500
@@ -244,8 +251,7 @@ def get_items(
 			filters["modified"] = [">", modified_after]
 
 		# Add item group filter
-		item_groups = get_item_groups(pos_profile.get("name"))
-		item_groups = [g.strip("'") for g in item_groups]
+		item_groups = pos_profile.item_groups
 		if item_groups:
 			filters["item_group"] = ["in", item_groups]
 
@@ -285,166 +291,94 @@ def get_items(
 			if pos_profile.get("posa_force_reload_items") and search_value:
 				limit_page_length = None
 
-		items_data = frappe.get_all(
-			"Item",
-			filters=filters,
-			or_filters=or_filters if or_filters else None,
-			fields=[
-				"name as item_code",
-				"item_name",
-				"description",
-				"stock_uom",
-				"image",
-				"is_stock_item",
-				"has_variants",
-				"variant_of",
-				"item_group",
-				"idx",
-				"has_batch_no",
-				"has_serial_no",
-				"max_discount",
-				"brand",
-				"custom_oem_part_number",
-			],
-			limit_start=limit_start,
-			limit_page_length=limit_page_length,
-			order_by="item_name asc",
-		)
+		# Out-of-stock items are dropped in SQL so LIMIT counts in-stock items
+		in_stock_warehouse = warehouse if posa_display_items_in_stock and warehouse else None
+
+		# Ranked search through the token index; the LIKE scan above stays as
+		# the fallback for terms the index cannot serve.
+		ranked_codes = None
+		if or_filters and cursor is None:
+			item_group_like = item_group if item_group and item_group.upper() != "ALL" else None
+			ranked_codes = search_item_codes(
+				item_code,
+				item_groups=None if item_group_like else item_groups,
+				item_group_like=item_group_like,
+				include_templates=bool(posa_show_template_items),
+				limit=((limit_start or 0) + limit_page_length) if limit_page_length else None,
+				in_stock_warehouse=in_stock_warehouse,
+			)
+			# No index hit keeps the LIKE scan, which also finds substrings
+			# inside words that the prefix tokens cannot match
+			if ranked_codes:
+				ranked_codes = ranked_codes[limit_start or 0 :]
+				filters["name"] = ["in", ranked_codes or [""]]
+				or_filters = []
+				limit_start = None
+				in_stock_warehouse = None
+
+		# Keyset pagination: when a cursor is passed (an empty string requests
+		# the first page) rows are ordered by (item_name, name) and each page
+		# starts strictly after the last row of the previous one, so every
+		# page costs the same and renames cannot shift rows between pages.
+		query_filters = filters
+		order_by = "item_name asc"
+		if cursor is not None:
+			order_by = "item_name asc, name asc"
+			limit_start = None
+			limit_page_length = limit_page_length or search_limit or DEFAULT_CURSOR_PAGE_SIZE
+			query_filters = [[key, *value] if isinstance(value, list) else [key, "=", value] for key, value in filters.items()]
+			after = decode_cursor(cursor)
+			if after:
+				last_item_name = frappe.db.escape(after[0])
+				query_filters.append(
+					f"(`tabItem`.`item_name` > {last_item_name} or "
+					f"(`tabItem`.`item_name` = {last_item_name} and `tabItem`.`name` > {frappe.db.escape(after[1])}))"
+				)
 
-		if items_data:
-			items = [d.item_code for d in items_data]
-			price_list_currency = frappe.db.get_value("Price List", price_list, "currency")
-			item_prices_data = frappe.get_all(
-				"Item Price",
-				fields=["item_code", "price_list_rate", "currency", "uom"],
-				filters={
-					"price_list": price_list,
-					"item_code": ["in", items],
-					"currency": price_list_currency or pos_profile.get("currency"),
-					"selling": 1,
-					"valid_from": ["<=", today],
-					"customer": ["in", ["", None, customer]],
-				},
-				or_filters=[
-					["valid_upto", ">=", today],
-					["valid_upto", "in", ["", None]],
-				],
-				order_by="valid_from ASC, valid_upto DESC",
+		if in_stock_warehouse or or_filters:
+			# LIKE matches are ranked exact code / prefix / contains in SQL
+			items_data = query_items(
+				query_filters,
+				or_filters=or_filters,
+				fields=get_item_query_fields(fields),
+				limit_start=limit_start,
+				limit_page_length=limit_page_length,
+				search_value=item_code if or_filters and cursor is None else None,
+				in_stock_warehouse=in_stock_warehouse,
+			)
+		else:
+			items_data = frappe.get_all(
+				"Item",
+				filters=query_filters,
+				or_filters=or_filters if or_filters else None,
+				fields=get_item_query_fields(fields),
+				limit_start=limit_start,
+				limit_page_length=limit_page_length,
+				order_by=order_by,
 			)
 
-			item_prices = {}
-			for d in item_prices_data:
-				item_prices.setdefault(d.item_code, {})
-				item_prices[d.item_code][d.get("uom") or "None"] = d
-
-			for item in items_data:
-				item_code = item.item_code
-				item_price = {}
-				if item_prices.get(item_code):
-					item_price = (
-						item_prices.get(item_code).get(item.stock_uom)
-						or item_prices.get(item_code).get("None")
-						or {}
-					)
-				item_barcode = frappe.get_all(
-					"Item Barcode",
-					filters={"parent": item_code},
-					fields=["barcode", "posa_uom"],
-				)
-				batch_no_data = []
-				if search_batch_no or item.has_batch_no:
-					batch_list = get_batch_qty(warehouse=warehouse, item_code=item_code)
-					if batch_list:
-						for batch in batch_list:
-							if batch.qty > 0 and batch.batch_no:
-								batch_doc = frappe.get_cached_doc("Batch", batch.batch_no)
-								if (
-									str(batch_doc.expiry_date) > str(today)
-									or batch_doc.expiry_date in ["", None]
-								) and batch_doc.disabled == 0:
-									batch_no_data.append(
-										{
-											"batch_no": batch.batch_no,
-											"batch_qty": batch.qty,
-											"expiry_date": batch_doc.expiry_date,
-											"batch_price": batch_doc.posa_batch_price,
-											"manufacturing_date": batch_doc.manufacturing_date,
-										}
-									)
-				serial_no_data = []
-				if search_serial_no or item.has_serial_no:
-					serial_no_data = frappe.get_all(
-						"Serial No",
-						filters={
-							"item_code": item_code,
-							"status": "Active",
-							"warehouse": warehouse,
-						},
-						fields=["name as serial_no"],
-					)
-				# Fetch UOM conversion details for the item
-				uoms = frappe.get_all(
-					"UOM Conversion Detail",
-					filters={"parent": item_code},
-					fields=["uom", "conversion_factor"],
-				)
-				stock_uom = item.stock_uom
-				if stock_uom and not any(u.get("uom") == stock_uom for u in uoms):
-					uoms.append({"uom": stock_uom, "conversion_factor": 1.0})
-				item_stock_qty = 0
-				if pos_profile.get("posa_display_items_in_stock") or use_limit_search:
-					item_stock_qty = get_stock_availability(item_code, pos_profile.get("warehouse"))
-				attributes = ""
-				if pos_profile.get("posa_show_template_items") and item.has_variants:
-					attributes = get_item_attributes(item.item_code)
-				item_attributes = ""
-				if pos_profile.get("posa_show_template_items") and item.variant_of:
-					item_attributes = frappe.get_all(
-						"Item Variant Attribute",
-						fields=["attribute", "attribute_value"],
-						filters={"parent": item.item_code, "parentfield": "attributes"},
-					)
-				if posa_display_items_in_stock and (not item_stock_qty or item_stock_qty < 0):
-					pass
-				else:
-					# Get additional rate information if enabled in POS Profile
-					last_purchase_rate = 0
-					last_customer_rate = 0
-					
-					# Check if rate features are enabled
-					show_purchase_rate = pos_profile.get("show_last_purchase_rate_in_list") or pos_profile.get("show_last_purchase_rate_in_cart")
-					show_customer_rate = pos_profile.get("custom_show_last_custom_rate")
-					
-					if show_purchase_rate:
-						last_purchase_rate = get_last_purchase_rate(item_code, pos_profile.get("warehouse"))
-					
-					if show_customer_rate and customer:
-						last_customer_rate = get_last_customer_rate(item_code, customer, price_list)
-					
-					row = {}
-					row.update(item)
-					row.update(
-						{
-							"rate": item_price.get("price_list_rate") or 0,
-							"currency": item_price.get("currency")
-							or price_list_currency
-							or pos_profile.get("currency"),
-							"item_barcode": item_barcode or [],
-							"actual_qty": item_stock_qty or 0,
-							"serial_no_data": serial_no_data or [],
-							"batch_no_data": batch_no_data or [],
-							"attributes": attributes or "",
-							"item_attributes": item_attributes or "",
-							"item_uoms": uoms or [],
-							"last_purchase_rate": last_purchase_rate,
-							"last_customer_rate": last_customer_rate,
-						}
-					)
-					result.append(row)
+		if ranked_codes:
+			rank = {code: idx for idx, code in enumerate(ranked_codes)}
+			items_data.sort(key=lambda d: rank.get(d.item_code, len(rank)))
+
+		result = enrich_items(
+			items_data,
+			pos_profile,
+			price_list,
+			customer=customer,
+			use_limit_search=use_limit_search,
+			fields=fields,
+		)
+
+		if cursor is not None:
+			next_cursor = None
+			if len(items_data) == limit_page_length:
+				next_cursor = encode_cursor(items_data[-1].item_name, items_data[-1].item_code)
+			return {"items": result, "next_cursor": next_cursor}
 		return result
 
 	if use_price_list:
-		return __get_items(
+		result = __get_items(
 		        pos_profile,
 		        price_list,
 		        item_group,
@@ -453,9 +387,11 @@ def get_items(
 		        limit,
 		        offset,
 		        modified_after,
+		        cursor,
+		        fields,
 		)
 	else:
-		return _get_items(
+		result = _get_items(
 		        pos_profile,
 		        price_list,
 		        item_group,
@@ -464,127 +400,186 @@ def get_items(
 		        limit,
 		        offset,
 		        modified_after,
+		        cursor,
+		        fields,
 		)
+	return to_wire_format(result, wire_format, rows_key="items")
 
 
 @frappe.whitelist()
-def get_items_groups():
-	return frappe.db.sql(
-		"""select name from `tabItem Group`
-	    where is_group = 0 order by name limit 500""",
-		as_dict=1,
+def get_items_groups(version=None):
+	return with_content_version(
+		["Item Group"],
+		[],
+		version,
+		lambda: frappe.db.sql(
+			"""select name from `tabItem Group`
+		    where is_group = 0 order by name limit 500""",
+			as_dict=1,
+		),
 	)
 
 
 @frappe.whitelist()
 def get_item_variants(pos_profile, parent_item_code, price_list=None, customer=None):
-	"""Return variants of an item along with attribute metadata."""
-	pos_profile = json.loads(pos_profile)
+	"""Return variants of an item along with attribute metadata.
+
+	Variant rows and the attribute index come from the cached variant matrix;
+	prices, stock, batches and serials are attached in bulk. Variants under a
+	pricing rule are resolved one by one for ``customer``, as in
+	``get_items_details``.
+	"""
+	pos_profile = get_pos_context(pos_profile)
 	price_list = price_list or pos_profile.get("selling_price_list")
+	warehouse = pos_profile.warehouse
+	company = pos_profile.company
 
-	fields = [
-		"name as item_code",
-		"item_name",
-		"description",
-		"stock_uom",
-		"image",
-		"is_stock_item",
-		"has_variants",
-		"variant_of",
-		"item_group",
-		"idx",
-		"has_batch_no",
-		"has_serial_no",
-		"max_discount",
-		"brand",
-		"custom_oem_part_number",
-	]
+	matrix = get_variant_matrix(parent_item_code)
+	if not matrix["variants"]:
+		return {"variants": [], "attributes_meta": {}, "attributes": [], "index": {}}
 
-	items_data = frappe.get_all(
-		"Item",
-		filters={"variant_of": parent_item_code, "disabled": 0},
-		fields=fields,
-		order_by="item_name asc",
+	variants = [frappe._dict(row) for row in matrix["variants"]]
+	pricing_rule_items = get_pricing_rule_item_codes(variants, company)
+	details = get_bulk_item_details(
+		[item for item in variants if item.item_code not in pricing_rule_items],
+		pos_profile,
+		warehouse,
+		price_list,
 	)
 
+	result = []
+	for item in variants:
+		row = dict(item)
+		if item.item_code in pricing_rule_items:
+			args = {key: value for key, value in row.items() if key not in ("item_barcode", "item_attributes")}
+			args.update({"pos_profile": pos_profile.get("name"), "customer": customer, "qty": 1})
+			row.update(
+				get_item_detail(json.dumps(args), warehouse=warehouse, price_list=price_list, company=company)
+				or {}
+			)
+		else:
+			row.update(details.get(item.item_code) or {})
+		row["item_barcode"] = item.item_barcode
+		row["item_attributes"] = item.item_attributes
+		result.append(row)
+
+	attributes_meta = {
+		attr["attribute"]: [v["attribute_value"] for v in attr["values"]] for attr in matrix["attributes"]
+	}
+	return {
+		"variants": result,
+		"attributes_meta": attributes_meta,
+		"attributes": matrix["attributes"],
+		"index": matrix["index"],
+	}
+
+
+@frappe.whitelist()
+def get_items_details(pos_profile, items_data, price_list=None):
+	pos_profile = get_pos_context(pos_profile)
+	items_data = json.loads(items_data)
+	warehouse = pos_profile.warehouse
+	price_list = price_list or pos_profile.get("selling_price_list")
+	company = pos_profile.company
+
+	# Skip template items to avoid ValidationError
+	items_data = [item for item in items_data or [] if item.get("item_code") and not item.get("has_variants")]
 	if not items_data:
-		return {"variants": [], "attributes_meta": {}}
+		return []
+
+	item_codes = list({item.get("item_code") for item in items_data})
+	item_docs = {
+		d.item_code: d
+		for d in frappe.get_all("Item", filters={"name": ["in", item_codes]}, fields=ITEM_FIELDS)
+	}
+	pricing_rule_items = get_pricing_rule_item_codes(list(item_docs.values()), company)
+	bulk_codes = [code for code in item_docs if code not in pricing_rule_items]
 
-	details = get_items_details(
-		json.dumps(pos_profile),
-		json.dumps(items_data),
-		price_list=price_list,
+	details = get_bulk_item_details(
+		[item_docs[code] for code in bulk_codes],
+		pos_profile,
+		warehouse,
+		price_list,
 	)
 
-	detail_map = {d["item_code"]: d for d in details}
 	result = []
 	for item in items_data:
-		item_barcode = frappe.get_all(
-			"Item Barcode",
-			filters={"parent": item["item_code"]},
-			fields=["barcode", "posa_uom"],
-		)
-		item["item_barcode"] = item_barcode or []
-		if detail_map.get(item["item_code"]):
-			item.update(detail_map[item["item_code"]])
-		result.append(item)
-
-	# --------------------------
-	# Build attributes meta *and* per-item attribute list
-	# --------------------------
-	attr_rows = frappe.get_all(
-		"Item Variant Attribute",
-		filters={"parent": ["in", [d["item_code"] for d in items_data]]},
-		fields=["parent", "attribute", "attribute_value"],
-	)
-
-	from collections import defaultdict
-
-	attributes_meta: dict[str, set] = defaultdict(set)
-	item_attr_map: dict[str, list] = defaultdict(list)
-
-	for row in attr_rows:
-		attributes_meta[row.attribute].add(row.attribute_value)
-		item_attr_map[row.parent].append({"attribute": row.attribute, "attribute_value": row.attribute_value})
+		item_code = item.get("item_code")
+		if item_code in details:
+			row = dict(details[item_code])
+			row.update({key: item[key] for key in ("posa_row_id", "qty") if item.get(key) is not None})
+			result.append(row)
+		else:
+			# Pricing rules and unknown items go through ERPNext's full resolution
+			item_detail = get_item_detail(
+				json.dumps(item),
+				warehouse=warehouse,
+				price_list=price_list,
+				company=company,
+			)
+			if item_detail:
+				result.append(item_detail)
 
-	attributes_meta = {k: sorted(v) for k, v in attributes_meta.items()}
+	return result
 
-	for item in result:
-		item["item_attributes"] = item_attr_map.get(item["item_code"], [])
 
-	# Ensure attributes_meta is always a dictionary
-	return {"variants": result, "attributes_meta": attributes_meta or {}}
+def get_bulk_item_details(items_data, pos_profile, warehouse, price_list):
+	"""Return ``{item_code: details}`` for items without pricing rules.
 
+	Currency context is resolved once and prices, UOMs, stock, batches and
+	serials are read for the whole set in a fixed number of queries.
+	"""
+	if not items_data:
+		return {}
 
-@frappe.whitelist()
-def get_items_details(pos_profile, items_data, price_list=None):
-	pos_profile = json.loads(pos_profile)
-	items_data = json.loads(items_data)
-	warehouse = pos_profile.get("warehouse")
-	company = (
-		pos_profile.get("company")
-		or frappe.defaults.get_user_default("Company")
-		or frappe.defaults.get_global_default("company")
-	)
-	result = []
+	price_list_currency, exchange_rate = pos_profile.get_currency_context(price_list)
+	item_codes = [d.item_code for d in items_data]
+	stock_codes = [d.item_code for d in items_data if d.is_stock_item]
 
-	if items_data:
-		for item in items_data:
-			item_code = item.get("item_code")
-			if item_code:
-				if item.get("has_variants"):
-					# Skip template items to avoid ValidationError
-					continue
-				item_detail = get_item_detail(
-					json.dumps(item),
-						warehouse=warehouse,
-						price_list=price_list or pos_profile.get("selling_price_list"),
-						company=company,
-					)
-				if item_detail:
-					result.append(item_detail)
+	item_prices = get_item_prices_map(item_codes, price_list, price_list_currency)
+	uoms = get_uoms_map(item_codes)
+	stock_qty = get_stock_qty_map(stock_codes, warehouse)
+	batches = get_batch_data_map([d.item_code for d in items_data if d.has_batch_no], warehouse)
+	serials = get_serial_counts_map([d.item_code for d in items_data if d.has_serial_no], warehouse)
 
-	return result
+	details = {}
+	for item in items_data:
+		item_code = item.item_code
+		prices = item_prices.get(item_code) or {}
+		price = prices.get(item.stock_uom) or prices.get("None") or {}
+		rate = flt(price.get("price_list_rate"))
+		item_uoms = with_stock_uom(uoms.get(item_code), item.stock_uom)
+		details[item_code] = {
+			"item_code": item_code,
+			"item_name": item.item_name,
+			"description": item.description,
+			"item_group": item.item_group,
+			"brand": item.brand,
+			"image": item.image,
+			"stock_uom": item.stock_uom,
+			"uom": item.stock_uom,
+			"conversion_factor": 1.0,
+			"is_stock_item": item.is_stock_item,
+			"has_batch_no": item.has_batch_no,
+			"has_serial_no": item.has_serial_no,
+			"price_list_currency": price_list_currency,
+			"plc_conversion_rate": exchange_rate,
+			"conversion_rate": exchange_rate,
+			"price_list_rate": rate,
+			"rate": rate,
+			"base_price_list_rate": flt(rate * exchange_rate),
+			"base_rate": flt(rate * exchange_rate),
+			"discount_percentage": 0,
+			"pricing_rules": "",
+			"fallback_price_used": False,
+			"actual_qty": stock_qty.get(item_code, 0.0) if warehouse and item.is_stock_item else 0,
+			"max_discount": item.max_discount,
+			"batch_no_data": batches.get(item_code) or [],
+			"serial_no_count": serials.get(item_code, 0),
+			"item_uoms": item_uoms,
+			"uom_prices": get_uom_prices(item_uoms, prices),
+		}
+	return details
 
 
 @frappe.whitelist()
@@ -602,38 +597,13 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None, company=Non
 	if doc and isinstance(doc, dict) and not isinstance(doc, frappe._dict):
 		doc = frappe._dict(doc)
 	
-	today = nowdate()
 	item_code = item.get("item_code")
 	batch_no_data = []
-	serial_no_data = []
+	serial_no_count = 0
 	if warehouse and item.get("has_batch_no"):
-		batch_list = get_batch_qty(warehouse=warehouse, item_code=item_code)
-		if batch_list:
-			for batch in batch_list:
-				if batch.qty > 0 and batch.batch_no:
-					batch_doc = frappe.get_cached_doc("Batch", batch.batch_no)
-					if (
-						str(batch_doc.expiry_date) > str(today) or batch_doc.expiry_date in ["", None]
-					) and batch_doc.disabled == 0:
-						batch_no_data.append(
-							{
-								"batch_no": batch.batch_no,
-								"batch_qty": batch.qty,
-								"expiry_date": batch_doc.expiry_date,
-								"batch_price": batch_doc.posa_batch_price,
-								"manufacturing_date": batch_doc.manufacturing_date,
-							}
-						)
+		batch_no_data = get_batch_data_map([item_code], warehouse).get(item_code) or []
 	if warehouse and item.get("has_serial_no"):
-		serial_no_data = frappe.get_all(
-			"Serial No",
-			filters={
-				"item_code": item_code,
-				"status": "Active",
-				"warehouse": warehouse,
-			},
-			fields=["name as serial_no"],
-		)
+		serial_no_count = get_serial_counts_map([item_code], warehouse).get(item_code, 0)
 
 	item["selling_price_list"] = price_list
 
@@ -644,43 +614,24 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None, company=Non
 	price_list_currency = None
 	exchange_rate = 1
 
-	if item.get("pos_profile"):
-		allow_multi_currency = (
-			frappe.db.get_value("POS Profile", item.get("pos_profile"), "posa_allow_multi_currency") or 0
-		)
+	ctx = get_pos_context(item.get("pos_profile"))
+	allow_multi_currency = ctx.allow_multi_currency
 
 	# Ensure conversion rate exists when price list currency differs from
 	# company currency to avoid ValidationError from ERPNext. Also provide
 	# sensible defaults when price list or currency is missing.
 	if company:
-		company_currency = frappe.db.get_value("Company", company, "default_currency")
-		price_list_currency = company_currency
-		if price_list:
-			price_list_currency = (
-				frappe.db.get_value("Price List", price_list, "currency") or company_currency
-			)
+		company_currency = ctx.get_company_currency(company)
+		price_list_currency = ctx.get_price_list_currency(price_list) or company_currency
 
 		if price_list_currency != company_currency and allow_multi_currency:
-			from erpnext.setup.utils import get_exchange_rate
-
-			try:
-				exchange_rate = get_exchange_rate(price_list_currency, company_currency, today)
-			except Exception:
-				frappe.log_error(
-					f"Missing exchange rate from {price_list_currency} to {company_currency}",
-					"POS Awesome",
-				)
+			exchange_rate = ctx.get_exchange_rate(price_list_currency, company_currency)
 	else:
 		# Fallback when no company is provided
-		if price_list:
-			price_list_currency = frappe.db.get_value("Price List", price_list, "currency")
+		price_list_currency = ctx.get_price_list_currency(price_list)
 		if not price_list_currency:
 			price_list_currency = frappe.defaults.get_user_default("Currency") or "USD"
 
-		item["price_list_currency"] = price_list_currency
-		item["plc_conversion_rate"] = exchange_rate
-		item["conversion_rate"] = exchange_rate
-
 	# Set currency information in item args
 	item["price_list_currency"] = price_list_currency
 	item["plc_conversion_rate"] = exchange_rate
@@ -720,20 +671,14 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None, company=Non
 	# Try to get price directly first, then use get_item_details for other fields
 	direct_price = 0.0
 	try:
-		direct_price_result = frappe.db.sql("""
-			SELECT price_list_rate
-			FROM `tabItem Price`
-			WHERE item_code = %s 
-			AND price_list = %s
-			AND selling = 1
-			AND (valid_from IS NULL OR valid_from <= CURDATE())
-			AND (valid_upto IS NULL OR valid_upto >= CURDATE())
-			ORDER BY valid_from DESC, modified DESC
-			LIMIT 1
-		""", (item_code, price_list), as_dict=True)
-		
-		if direct_price_result and len(direct_price_result) > 0:
-			direct_price = flt(direct_price_result[0].price_list_rate or 0.0)
+		effective_price = get_effective_price(
+			item_code,
+			price_list,
+			uom=item.get("uom") or item.get("stock_uom") or frappe.get_cached_value("Item", item_code, "stock_uom"),
+			customer=item.get("customer"),
+		)
+		if effective_price:
+			direct_price = flt(effective_price.price_list_rate or 0.0)
 	except Exception as e:
 		frappe.logger().error(f"Error getting direct price for {item_code}: {str(e)}")
 	
@@ -758,7 +703,7 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None, company=Non
 		res["actual_qty"] = get_stock_availability(item_code, warehouse)
 	res["max_discount"] = max_discount
 	res["batch_no_data"] = batch_no_data
-	res["serial_no_data"] = serial_no_data
+	res["serial_no_count"] = serial_no_count
 
 	# Add UOMs data directly from item document
 	uoms = frappe.get_all(
@@ -786,39 +731,30 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None, company=Non
 
 @frappe.whitelist()
 def get_items_from_barcode(selling_price_list, currency, barcode):
-	search_item = frappe.db.get_value(
-		"Item Barcode",
-		{"barcode": barcode},
-		["parent as item_code", "posa_uom"],
-		as_dict=1,
-	)
-	if search_item:
-		item_doc = frappe.get_cached_doc("Item", search_item.item_code)
-		item_price = frappe.db.get_value(
-			"Item Price",
-			{
-				"item_code": search_item.item_code,
-				"price_list": selling_price_list,
-				"currency": currency,
-			},
-			"price_list_rate",
+	search_item = resolve_code(barcode)
+	if search_item and not (search_item.get("batch_no") or search_item.get("serial_no")):
+		item_doc = frappe.get_cached_doc("Item", search_item["item_code"])
+		item_price = get_effective_price(
+			item_doc.name,
+			selling_price_list,
+			uom=search_item.get("uom") or item_doc.stock_uom,
+			currency=currency,
 		)
 
 		return {
 			"item_code": item_doc.name,
 			"item_name": item_doc.item_name,
 			"barcode": barcode,
-			"rate": item_price or 0,
-			"uom": search_item.posa_uom or item_doc.stock_uom,
+			"rate": item_price.price_list_rate if item_price else 0,
+			"uom": search_item.get("uom") or item_doc.stock_uom,
 			"currency": currency,
 		}
 	return None
 
 
 def build_item_cache(item_code):
-	"""Build item cache for faster access."""
-	# Implementation for building item cache
-	pass
+	"""Build the variant matrix of template ``item_code``."""
+	return build_variant_matrix(item_code)
 
 
 def get_item_optional_attributes(item_code):
@@ -855,41 +791,19 @@ def get_item_attributes(item_code):
 @frappe.whitelist()
 def search_serial_or_batch_or_barcode_number(search_value, search_serial_no):
 	"""Search for items by serial number, batch number, or barcode."""
-	# Search by barcode
-	barcode_data = frappe.db.get_value(
-		"Item Barcode",
-		{"barcode": search_value},
-		["parent as item_code", "barcode"],
-		as_dict=True,
-	)
-	if barcode_data:
-		return {"item_code": barcode_data.item_code, "barcode": barcode_data.barcode}
-
-	# Search by batch number
-	batch_data = frappe.db.get_value(
-		"Batch",
-		{"name": search_value},
-		["item as item_code", "name as batch_no"],
-		as_dict=True,
-	)
-	if batch_data:
-		return {"item_code": batch_data.item_code, "batch_no": batch_data.batch_no}
-
-	# Search by serial number if enabled
-	if search_serial_no:
-		serial_data = frappe.db.get_value(
-			"Serial No",
-			{"name": search_value},
-			["item_code", "name as serial_no"],
-			as_dict=True,
-		)
-		if serial_data:
-			return {
-				"item_code": serial_data.item_code,
-				"serial_no": serial_data.serial_no,
-			}
+	data = resolve_code(search_value)
+	if not data:
+		return {}
 
-	return {}
+	if data.get("serial_no"):
+		if not search_serial_no:
+			return {}
+		return {"item_code": data["item_code"], "serial_no": data["serial_no"]}
+
+	if data.get("batch_no"):
+		return {"item_code": data["item_code"], "batch_no": data["batch_no"]}
+
+	return {"item_code": data["item_code"], "barcode": search_value}
 
 
 @frappe.whitelist()
@@ -927,23 +841,224 @@ def update_price_list_rate(item_code, price_list, rate, uom=None):
 	return _("Item Price has been added or updated")
 
 
+def _parse_rate(rate):
+	"""Return ``rate`` as a finite float, or ``None`` when it is not a number."""
+	if isinstance(rate, bool) or rate is None or rate == "":
+		return None
+	try:
+		rate = float(rate)
+	except (TypeError, ValueError):
+		return None
+	return rate if math.isfinite(rate) else None
+
+
+@frappe.whitelist(methods=["POST"])
+def update_price_list_rates(rows):
+	"""Upsert many selling Item Prices in one transaction.
+
+	``rows`` is a JSON list of ``{item_code, price_list, rate, uom}``. The
+	generic (no customer) price of each item, price list and UOM is updated,
+	or created valid from today. Nothing is written if any row is invalid.
+	Effective prices are refreshed and a single ``posa_prices_updated``
+	realtime event is published for all affected items.
+	"""
+	frappe.has_permission("Item Price", "write", throw=True)
+	rows = json.loads(rows) if isinstance(rows, str) else rows
+	if not rows:
+		return {"updated": 0, "created": 0}
+	if len(rows) > MAX_BULK_PRICE_ROWS:
+		frappe.throw(_("At most {0} prices can be updated at once").format(MAX_BULK_PRICE_ROWS))
+
+	prices = {}
+	for row in rows:
+		key = (row.get("item_code"), row.get("price_list"), row.get("uom") or "")
+		prices[key] = _parse_rate(row.get("rate"))
+
+	item_codes = list({key[0] for key in prices if key[0]})
+	price_lists = list({key[1] for key in prices if key[1]})
+	items = {
+		d.name: d
+		for d in frappe.get_all(
+			"Item",
+			filters={"name": ["in", item_codes or [""]]},
+			fields=["name", "item_name", "description", "brand", "stock_uom", "disabled"],
+		)
+	}
+	price_list_docs = {
+		d.name: d
+		for d in frappe.get_all(
+			"Price List",
+			filters={"name": ["in", price_lists or [""]]},
+			fields=["name", "currency", "selling", "enabled"],
+		)
+	}
+	uoms = set(
+		frappe.get_all("UOM", filters={"name": ["in", list({key[2] for key in prices if key[2]}) or [""]]}, pluck="name")
+	)
+
+	errors = []
+	for (item_code, price_list, uom), rate in prices.items():
+		label = f"{item_code} / {price_list}" + (f" / {uom}" if uom else "")
+		if not item_code or not price_list:
+			errors.append(_("Item Code and Price List are required"))
+		elif item_code not in items or items[item_code].disabled:
+			errors.append(_("{0}: item does not exist or is disabled").format(label))
+		elif price_list not in price_list_docs or not price_list_docs[price_list].enabled:
+			errors.append(_("{0}: price list does not exist or is disabled").format(label))
+		elif not price_list_docs[price_list].selling:
+			errors.append(_("{0}: price list is not a selling price list").format(label))
+		elif uom and uom not in uoms:
+			errors.append(_("{0}: UOM does not exist").format(label))
+		elif rate is None or rate < 0:
+			errors.append(_("{0}: rate must be a number, zero or more").format(label))
+	if errors:
+		frappe.throw("<br>".join(errors[:20]), title=_("Invalid prices"))
+
+	# The raw writes below skip Item Price validate and doc events. The checks
+	# above and the overlap check below stand in for validate; the hooks this
+	# app relies on are called at the end.
+
+	# The generic price in effect today is the one updated, picked as in the
+	# effective price table; keys without one get a new price from today
+	today = nowdate()
+	existing = {}
+	for d in frappe.db.sql(
+		"""
+		SELECT name, item_code, price_list, IFNULL(uom, '') AS uom
+		FROM `tabItem Price`
+		WHERE item_code IN %(item_codes)s
+		AND price_list IN %(price_lists)s
+		AND selling = 1
+		AND IFNULL(customer, '') = ''
+		AND IFNULL(batch_no, '') = ''
+		AND (valid_from IS NULL OR valid_from <= %(today)s)
+		AND (valid_upto IS NULL OR valid_upto >= %(today)s)
+		ORDER BY valid_from ASC, modified ASC
+		""",
+		{"item_codes": tuple(item_codes), "price_lists": tuple(price_lists), "today": today},
+		as_dict=True,
+	):
+		existing[(d.item_code, d.price_list, d.uom)] = d.name
+
+	# A new price runs from today with no end, so it must not overlap a
+	# generic price that starts later, as Item Price's duplicate check enforces
+	new_keys = [key for key in prices if key not in existing]
+	if new_keys:
+		overlapping = {
+			(d.item_code, d.price_list, d.uom)
+			for d in frappe.db.sql(
+				"""
+				SELECT item_code, price_list, IFNULL(uom, '') AS uom
+				FROM `tabItem Price`
+				WHERE item_code IN %(item_codes)s
+				AND price_list IN %(price_lists)s
+				AND selling = 1
+				AND IFNULL(customer, '') = ''
+				AND IFNULL(batch_no, '') = ''
+				AND valid_from > %(today)s
+				""",
+				{"item_codes": tuple(item_codes), "price_lists": tuple(price_lists), "today": today},
+				as_dict=True,
+			)
+		}
+		errors = [
+			_("{0}: a price starting after today already exists").format(f"{key[0]} / {key[1]}")
+			for key in new_keys
+			if key in overlapping
+		]
+		if errors:
+			frappe.throw("<br>".join(errors[:20]), title=_("Invalid prices"))
+
+	now = frappe.utils.now()
+	user = frappe.session.user
+	updates = [(existing[key], rate) for key, rate in prices.items() if key in existing]
+	for start in range(0, len(updates), 500):
+		chunk = updates[start : start + 500]
+		values = {"now": now, "user": user, "names": tuple(name for name, _rate in chunk)}
+		for i, (name, rate) in enumerate(chunk):
+			values[f"name_{i}"] = name
+			values[f"rate_{i}"] = rate
+		cases = " ".join(f"WHEN %(name_{i})s THEN %(rate_{i})s" for i in range(len(chunk)))
+		frappe.db.sql(
+			f"""
+			UPDATE `tabItem Price`
+			SET price_list_rate = CASE name {cases} END, modified = %(now)s, modified_by = %(user)s
+			WHERE name IN %(names)s
+			""",
+			values,
+		)
+
+	inserts = []
+	for (item_code, price_list, uom), rate in prices.items():
+		if (item_code, price_list, uom) in existing:
+			continue
+		item = items[item_code]
+		inserts.append(
+			(
+				frappe.generate_hash(length=10),
+				item_code,
+				item.item_name,
+				item.description,
+				item.brand,
+				# No UOM is stored as NULL, as update_price_list_rate does
+				uom or None,
+				price_list,
+				price_list_docs[price_list].currency,
+				rate,
+				1,
+				0,
+				today,
+				now,
+				now,
+				user,
+				user,
+			)
+		)
+	if inserts:
+		frappe.db.bulk_insert(
+			"Item Price",
+			fields=[
+				"name",
+				"item_code",
+				"item_name",
+				"item_description",
+				"brand",
+				"uom",
+				"price_list",
+				"currency",
+				"price_list_rate",
+				"selling",
+				"buying",
+				"valid_from",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+			],
+			values=inserts,
+			chunk_size=1000,
+		)
+
+	for price_list in price_lists:
+		refresh_effective_prices([key[0] for key in prices if key[1] == price_list], price_list)
+	clear_reference_version("Item Price")
+	frappe.db.after_commit.add(lambda: enqueue_price_list_snapshots(price_lists))
+	frappe.publish_realtime(
+		"posa_prices_updated",
+		{"price_lists": price_lists, "item_codes": item_codes},
+		after_commit=True,
+	)
+	return {"updated": len(updates), "created": len(inserts)}
+
+
 @frappe.whitelist()
 def get_price_for_uom(item_code, price_list, uom):
 	"""Return Item Price for the given item, price list and UOM if it exists."""
 	if not (item_code and price_list and uom):
 		return None
 
-	price = frappe.db.get_value(
-		"Item Price",
-		{
-			"item_code": item_code,
-			"price_list": price_list,
-			"uom": uom,
-			"selling": 1,
-		},
-		"price_list_rate",
-	)
-	return price
+	price = get_effective_price(item_code, price_list, uom=uom, any_uom=False)
+	return price.price_list_rate if price else None
 
 
 @frappe.whitelist()
@@ -1055,12 +1170,11 @@ def check_for_changes(pos_profile, price_list, modified_after):
 		stock_changes = []
 		if pos_profile.get("warehouse"):
 			stock_changes = frappe.db.sql("""
-				SELECT DISTINCT sle.item_code, sle.modified, sle.actual_qty
-				FROM `tabStock Ledger Entry` sle
-				WHERE sle.warehouse = %s
-				AND sle.is_cancelled = 0
-				AND sle.modified > %s
-				ORDER BY sle.modified DESC
+				SELECT item_code, modified, actual_qty
+				FROM `tabBin`
+				WHERE warehouse = %s
+				AND modified > %s
+				ORDER BY modified DESC
 				LIMIT 100
 			""", (pos_profile.get("warehouse"), modified_since), as_dict=True)
 		
@@ -1220,17 +1334,59 @@ def check_for_changes(pos_profile, price_list, modified_after):
 
 
 @frappe.whitelist()
-def get_items_by_codes(pos_profile, price_list, item_codes):
+def get_warehouse_stock(warehouse, item_codes=None, modified_after=None, wire_format=None):
+	"""Return ``[{item_code, actual_qty, reserved_qty, projected_qty}]`` from ``Bin``.
+
+	Without ``item_codes`` the whole warehouse is returned in one call,
+	skipping items with no quantities unless ``modified_after`` asks for the
+	Bins changed since then. Requested items without a Bin report zero.
+	``wire_format="columnar"`` returns the rows column-encoded and compressed.
+	"""
+	if not warehouse:
+		frappe.throw(_("Warehouse is required"))
+	item_codes = json.loads(item_codes) if isinstance(item_codes, str) else item_codes
+
+	if item_codes:
+		stock = get_bin_stock_map(item_codes, warehouse)
+		empty = {"actual_qty": 0.0, "reserved_qty": 0.0, "projected_qty": 0.0}
+		rows = [{"item_code": code, **(stock.get(code) or empty)} for code in dict.fromkeys(item_codes)]
+		return to_wire_format(rows, wire_format)
+
+	conditions = ["warehouse = %(warehouse)s"]
+	values = {"warehouse": warehouse}
+	if modified_after:
+		conditions.append("modified > %(modified_after)s")
+		values["modified_after"] = modified_after
+	else:
+		conditions.append("(actual_qty != 0 OR reserved_qty != 0 OR projected_qty != 0)")
+	rows = frappe.db.sql(
+		f"""
+		SELECT item_code, actual_qty, reserved_qty, projected_qty
+		FROM `tabBin`
+		WHERE {" AND ".join(conditions)}
+		ORDER BY item_code
+		""",
+		values,
+		as_dict=True,
+	)
+	return to_wire_format(rows, wire_format)
+
+
+@frappe.whitelist()
+def get_items_by_codes(pos_profile, price_list, item_codes, fields=None, wire_format=None):
 	"""
 	Get specific items by their item codes for selective updates.
 	This is more efficient than loading all items when only a few have changed.
+	``fields`` limits the returned keys, skipping unrequested sub-collections.
+	``wire_format="columnar"`` returns the rows column-encoded and compressed.
 	"""
 	try:
-		pos_profile = json.loads(pos_profile) if isinstance(pos_profile, str) else pos_profile
+		pos_profile = get_pos_context(pos_profile)
 		item_codes = json.loads(item_codes) if isinstance(item_codes, str) else item_codes
+		fields = parse_fields(fields)
 		
 		if not item_codes:
-			return []
+			return to_wire_format([], wire_format)
 		
 		# Limit to reasonable batch size to prevent server overload
 		if len(item_codes) > 100:
@@ -1246,8 +1402,7 @@ def get_items_by_codes(pos_profile, price_list, item_codes):
 		item_code_condition = f" AND item.name IN ({item_codes_str})"
 		
 		# Get item groups for the POS profile
-		from erpnext.accounts.doctype.pos_profile.pos_profile import get_item_groups
-		item_groups = get_item_groups(pos_profile.get("name"))
+		item_groups = pos_profile.item_groups
 		
 		# Build item group condition if needed
 		item_group_condition = ""
@@ -1274,15 +1429,8 @@ def get_items_by_codes(pos_profile, price_list, item_codes):
 				item.weight_uom,
 				item.max_discount,
 				item.brand,
-				item.custom_oem_part_number,
-				COALESCE(ip.price_list_rate, 0) AS rate,
-				COALESCE(ip.price_list_rate, 0) AS price_list_rate
+				item.custom_oem_part_number
 			FROM `tabItem` item
-			LEFT JOIN `tabItem Price` ip ON (
-				ip.item_code = item.name 
-				AND ip.price_list = %s 
-				AND ip.selling = 1
-			)
 			WHERE item.disabled = 0 
 			AND item.is_sales_item = 1
 			{item_group_condition}
@@ -1290,83 +1438,65 @@ def get_items_by_codes(pos_profile, price_list, item_codes):
 			ORDER BY item.item_name
 		"""
 		
-		items = frappe.db.sql(query, (price_list_name,), as_dict=True)
-		
+		items = frappe.db.sql(query, as_dict=True)
+		
+		def wants(key):
+			return fields is None or key in fields
+
+		codes = [item.item_code for item in items]
+		item_prices = get_effective_prices_map(codes, price_list_name) if wants("rate") or wants("price_list_rate") or wants("uom_prices") else {}
+		stock_codes = [item.item_code for item in items if item.is_stock_item]
+		stock_qty = get_stock_qty_map(stock_codes, warehouse) if wants("actual_qty") else {}
+		barcodes = get_barcodes_map(codes) if wants("item_barcode") else {}
+		uoms = get_uoms_map(codes) if wants("item_uoms") or wants("uom_prices") else {}
+		serials = {}
+		if wants("serial_no_count"):
+			serials = get_serial_counts_map([item.item_code for item in items if item.has_serial_no], warehouse)
+		batches = {}
+		if wants("batch_no_data"):
+			batches = get_batch_data_map([item.item_code for item in items if item.has_batch_no], warehouse)
+
+		# Check if rate features are enabled
+		show_purchase_rate = pos_profile.get("show_last_purchase_rate_in_list") or pos_profile.get("show_last_purchase_rate_in_cart")
+		purchase_rates = {}
+		if show_purchase_rate and wants("last_purchase_rate"):
+			purchase_rates = get_last_purchase_rates_map(codes, warehouse)
+
 		# Process items similar to get_items
 		result = []
 		for item in items:
-			item.rate = flt(item.rate or 0)
-			item.price_list_rate = flt(item.price_list_rate or 0)
-			
-			# Get actual stock quantity - always fetch for Smart Sync updates
-			if item.is_stock_item and warehouse:
-				try:
-					stock_qty = get_stock_availability(item.item_code, warehouse)
-					item.actual_qty = flt(stock_qty)
-					frappe.logger().info(f"✅ Stock for {item.item_code}: {stock_qty} (is_stock_item: {item.is_stock_item}, warehouse: {warehouse})")
-				except Exception as e:
-					frappe.logger().error(f"❌ Error getting stock for {item.item_code}: {str(e)}")
-					item.actual_qty = 0.0
-			else:
-				item.actual_qty = 0.0
-				if not item.is_stock_item:
-					frappe.logger().info(f"📦 Non-stock item {item.item_code}: actual_qty set to 0")
-				else:
-					frappe.logger().warning(f"⚠️ No warehouse specified for stock item {item.item_code}")
-			
-			# Get item barcodes
-			item_barcode = get_item_barcodes(item.item_code)
-			item['item_barcode'] = item_barcode or []
-			
-			# Get UOMs
-			item_uoms = get_item_uoms(item.item_code)
-			item['item_uoms'] = item_uoms or []
-			
-			# Get serial numbers if applicable
-			if item.has_serial_no:
-				serial_no_data = get_serial_nos(item.item_code, warehouse)
-				item['serial_no_data'] = serial_no_data or []
-			else:
-				item['serial_no_data'] = []
-			
-			# Get batch numbers if applicable
-			if item.has_batch_no:
-				batch_no_data = get_batch_nos(item.item_code, warehouse)
-				item['batch_no_data'] = batch_no_data or []
-			else:
-				item['batch_no_data'] = []
-			
-			# Set currency
+			prices = item_prices.get(item.item_code) or {}
+			item_price = prices.get(item.stock_uom) or prices.get("None") or {}
+			item.rate = flt(item_price.get("price_list_rate") or 0)
+			item.price_list_rate = item.rate
+
+			# Always report stock for Smart Sync updates
+			item.actual_qty = flt(stock_qty.get(item.item_code, 0.0)) if warehouse else 0.0
+			item['item_barcode'] = barcodes.get(item.item_code) or []
+			item['item_uoms'] = uoms.get(item.item_code) or []
+			if wants("uom_prices"):
+				item['uom_prices'] = get_uom_prices(with_stock_uom(item['item_uoms'], item.stock_uom), prices)
+			item['thumbnail'] = get_thumbnail_url(item.image) if wants("thumbnail") else None
+			item['serial_no_count'] = serials.get(item.item_code, 0)
+			item['batch_no_data'] = batches.get(item.item_code) or []
 			item['currency'] = pos_profile.get('currency', 'USD')
-			
-			# Get additional rate information if enabled in POS Profile
-			last_purchase_rate = 0
-			last_customer_rate = 0
-			
-			# Check if rate features are enabled
-			show_purchase_rate = pos_profile.get("show_last_purchase_rate_in_list") or pos_profile.get("show_last_purchase_rate_in_cart")
-			show_customer_rate = pos_profile.get("show_last_customer_rate_in_list") or pos_profile.get("show_last_customer_rate_in_cart")
-			
-			if show_purchase_rate:
-				last_purchase_rate = get_last_purchase_rate(item.item_code, warehouse)
-			
+
 			# For customer rate, we would need customer info which isn't available in this context
 			# This will be handled at the frontend level when customer is selected
-			
-			item['last_purchase_rate'] = last_purchase_rate
-			item['last_customer_rate'] = last_customer_rate
-			
-			result.append(item)
-		
+			item['last_purchase_rate'] = purchase_rates.get(item.item_code, 0)
+			item['last_customer_rate'] = 0
+
+			result.append(frappe._dict(project_row(item, fields)))
+
 		frappe.logger().info(f"Retrieved {len(result)} specific items for selective update with quantities")
 		
 		# Log summary of quantities for debugging
-		stock_items = [item for item in result if item.is_stock_item]
+		stock_items = [item for item in result if item.get("is_stock_item")]
 		frappe.logger().info(f"Stock items: {len(stock_items)}, Non-stock items: {len(result) - len(stock_items)}")
 		for item in stock_items[:5]:  # Log first 5 stock items for debugging
-			frappe.logger().info(f"📊 {item.item_code}: qty={item.actual_qty}, rate={item.rate}")
+			frappe.logger().info(f"📊 {item.item_code}: qty={item.get('actual_qty')}, rate={item.get('rate')}")
 		
-		return result
+		return to_wire_format(result, wire_format)
 		
 	except Exception as e:
 		frappe.logger().error(f"Error getting items by codes: {str(e)}")
@@ -1428,16 +1558,13 @@ def get_item_uoms(item_code):
 	""", (item_code,), as_dict=True)
 
 
-def get_serial_nos(item_code, warehouse):
-	"""Get available serial numbers for an item."""
-	return frappe.db.sql("""
-		SELECT serial_no, item_code, warehouse
-		FROM `tabSerial No`
-		WHERE item_code = %s 
-		AND warehouse = %s
-		AND status = 'Active'
-		LIMIT 100
-	""", (item_code, warehouse), as_dict=True)
+def get_serial_nos(item_code, warehouse, txt=None, after=None):
+	"""Get a page of available serial numbers for an item."""
+	page = search_serial_nos(item_code, warehouse, txt=txt, after=after, page_length=100)
+	return [
+		frappe._dict(serial_no=serial_no, item_code=item_code, warehouse=warehouse)
+		for serial_no in page["serial_nos"]
+	]
 
 
 def get_batch_nos(item_code, warehouse):
@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 import json
 import frappe
 from frappe.utils import nowdate
+from posawesome.posawesome.api.reference_version import with_content_version
 from posawesome.posawesome.doctype.pos_coupon.pos_coupon import check_coupon_code
 from posawesome.posawesome.doctype.delivery_charges.delivery_charges import (
 	get_applicable_delivery_charges as _get_applicable_delivery_charges,
@@ -37,7 +38,11 @@ def get_active_gift_coupons(customer, company):
 
 
 @frappe.whitelist()
-def get_offers(profile):
+def get_offers(profile, version=None):
+	return with_content_version(["POS Offer", "POS Profile"], [profile], version, lambda: _get_offers(profile))
+
+
+def _get_offers(profile):
 	pos_profile = frappe.get_doc("POS Profile", profile)
 	company = pos_profile.company
 	warehouse = pos_profile.warehouse
@@ -0,0 +1,123 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Request-scoped POS context.
+
+Item, pricing and stock helpers all need the parsed POS Profile, its item
+group subtree, the company and price list currencies and exchange rates.
+``get_pos_context`` builds one ``POSContext`` per profile per request and
+keeps it on ``frappe.local`` so these are resolved once, however many
+helpers ask for them.
+"""
+
+import json
+
+import frappe
+from frappe.utils import nowdate
+
+from posawesome.posawesome.api.exchange_rates import get_exchange_rate
+from posawesome.posawesome.api.group_tree import get_profile_groups
+
+
+class POSContext:
+	def __init__(self, profile):
+		self.profile = frappe._dict(profile)
+		self.name = self.profile.get("name")
+		self.warehouse = self.profile.get("warehouse")
+		self.company = (
+			self.profile.get("company")
+			or frappe.defaults.get_user_default("Company")
+			or frappe.defaults.get_global_default("company")
+		)
+		self.allow_multi_currency = bool(self.profile.get("posa_allow_multi_currency"))
+		self._company_currencies = {}
+		self._price_list_currencies = {}
+		self._exchange_rates = {}
+
+	def get(self, key, default=None):
+		return self.profile.get(key, default)
+
+	@property
+	def item_groups(self):
+		return get_profile_groups(self.name, "Item Group")
+
+	@property
+	def escaped_item_groups(self):
+		return [frappe.db.escape(g) for g in self.item_groups]
+
+	@property
+	def customer_groups(self):
+		return get_profile_groups(self.name, "Customer Group")
+
+	@property
+	def company_currency(self):
+		return self.get_company_currency(self.company)
+
+	def get_company_currency(self, company):
+		if company not in self._company_currencies:
+			self._company_currencies[company] = (
+				frappe.get_cached_value("Company", company, "default_currency") if company else None
+			)
+		return self._company_currencies[company]
+
+	def get_price_list_currency(self, price_list):
+		if price_list not in self._price_list_currencies:
+			self._price_list_currencies[price_list] = (
+				frappe.get_cached_value("Price List", price_list, "currency") if price_list else None
+			)
+		return self._price_list_currencies[price_list]
+
+	def get_exchange_rate(self, from_currency, to_currency):
+		if not from_currency or not to_currency or from_currency == to_currency:
+			return 1
+		key = (from_currency, to_currency)
+		if key not in self._exchange_rates:
+			try:
+				self._exchange_rates[key] = get_exchange_rate(from_currency, to_currency, nowdate()) or 1
+			except Exception:
+				frappe.log_error(
+					f"Missing exchange rate from {from_currency} to {to_currency}",
+					"POS Awesome",
+				)
+				self._exchange_rates[key] = 1
+		return self._exchange_rates[key]
+
+	def get_currency_context(self, price_list, allow_multi_currency=None):
+		"""Return ``(price_list_currency, exchange_rate)`` for ``price_list``."""
+		if allow_multi_currency is None:
+			allow_multi_currency = self.allow_multi_currency
+		price_list_currency = (
+			self.get_price_list_currency(price_list)
+			or self.company_currency
+			or frappe.defaults.get_user_default("Currency")
+			or "USD"
+		)
+		exchange_rate = 1
+		if allow_multi_currency:
+			exchange_rate = self.get_exchange_rate(price_list_currency, self.company_currency)
+		return price_list_currency, exchange_rate
+
+
+def get_pos_context(pos_profile=None):
+	"""Return the ``POSContext`` of ``pos_profile`` for the current request.
+
+	``pos_profile`` may be the profile JSON sent by the client, a dict or a
+	profile name.
+	"""
+	if isinstance(pos_profile, POSContext):
+		return pos_profile
+
+	if isinstance(pos_profile, str) and pos_profile.startswith("{"):
+		key = pos_profile
+		pos_profile = json.loads(pos_profile)
+	elif isinstance(pos_profile, dict):
+		key = frappe.as_json(pos_profile, indent=None)
+	else:
+		key = pos_profile or ""
+		pos_profile = frappe.get_cached_doc("POS Profile", pos_profile).as_dict() if pos_profile else {}
+
+	if not hasattr(frappe.local, "posa_pos_context"):
+		frappe.local.posa_pos_context = {}
+	if key not in frappe.local.posa_pos_context:
+		frappe.local.posa_pos_context[key] = POSContext(pos_profile)
+	return frappe.local.posa_pos_context[key]
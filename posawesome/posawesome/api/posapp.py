@@ -6,11 +6,9 @@ from __future__ import unicode_literals
 import json
 import frappe
 from frappe.utils import nowdate, flt, cstr, getdate, cint, money_in_words
-from erpnext.setup.utils import get_exchange_rate
 from frappe import _
 from erpnext.accounts.doctype.sales_invoice.sales_invoice import get_bank_cash_account
 from erpnext.stock.get_item_details import get_item_details
-from erpnext.accounts.doctype.pos_profile.pos_profile import get_item_groups
 from frappe.utils.background_jobs import enqueue
 from erpnext.accounts.party import get_party_bank_account
 from erpnext.stock.doctype.batch.batch import (
@@ -31,6 +29,20 @@ from posawesome.posawesome.doctype.delivery_charges.delivery_charges import (
 	get_applicable_delivery_charges as _get_applicable_delivery_charges,
 )
 from frappe.utils.caching import redis_cache
+from posawesome.posawesome.api.exchange_rates import get_exchange_rate
+from posawesome.posawesome.api.group_tree import get_profile_groups
+from posawesome.posawesome.api.item_search import query_items
+from posawesome.posawesome.api.pos_context import get_pos_context
+from posawesome.posawesome.api.reference_version import with_content_version
+from posawesome.posawesome.api.item_enrichment import (
+	enrich_items,
+	get_batch_data_map,
+	get_item_query_fields,
+	get_serial_counts_map,
+	get_stock_qty_map,
+	get_uoms_map,
+	with_stock_uom,
+)
 from typing import List, Dict
 
 
@@ -150,7 +162,7 @@ def get_items(
 	limit=None,
 	offset=None,
 ):
-	_pos_profile = json.loads(pos_profile)
+	_pos_profile = get_pos_context(pos_profile)
 	use_price_list = _pos_profile.get("posa_use_server_cache")
 
 	@redis_cache(ttl=60)
@@ -182,7 +194,7 @@ def get_items(
 		limit=None,
 		offset=None,
 	):
-		pos_profile = json.loads(pos_profile)
+		pos_profile = get_pos_context(pos_profile)
 		condition = ""
 
 		# Clear quantity cache to ensure fresh values on each search
@@ -194,7 +206,6 @@ def get_items(
 		except Exception as e:
 			frappe.log_error(f"Error clearing bin_qty_cache: {str(e)}", "POS Awesome")
 
-		today = nowdate()
 		warehouse = pos_profile.get("warehouse")
 		use_limit_search = pos_profile.get("pose_use_limit_search")
 		search_serial_no = pos_profile.get("posa_search_serial_no")
@@ -224,7 +235,7 @@ def get_items(
 			if offset:
 				limit_clause += f" OFFSET {offset}"
 
-		condition += get_item_group_condition(pos_profile.get("name"))
+		condition += get_item_group_condition(pos_profile)
 
 		if use_limit_search and limit is None:
 			search_limit = pos_profile.get("posa_search_limit") or 1000  # Increased from 500 to 1000
@@ -260,8 +271,7 @@ def get_items(
 		filters = {"disabled": 0, "is_sales_item": 1, "is_fixed_asset": 0}
 
 		# Add item group filter
-		item_groups = get_item_groups(pos_profile.get("name"))
-		item_groups = [g.strip("'") for g in item_groups]
+		item_groups = pos_profile.item_groups
 		if item_groups:
 			filters["item_group"] = ["in", item_groups]
 
@@ -323,184 +333,25 @@ def get_items(
 			if pos_profile.get("posa_force_reload_items") and search_value:
 				limit_page_length = None
 
-		items_data = frappe.get_all(
-			"Item",
-			filters=filters,
-			or_filters=or_filters if or_filters else None,
-			fields=[
-				"name as item_code",
-				"item_name",
-				"description",
-				"stock_uom",
-				"image",
-				"is_stock_item",
-				"has_variants",
-				"variant_of",
-				"item_group",
-				"idx",
-				"has_batch_no",
-				"has_serial_no",
-				"max_discount",
-				"brand",
-			],
+		# Stock filtering and exact / prefix / contains ranking run in SQL so
+		# the limit returns the top in-stock matches
+		items_data = query_items(
+			filters,
+			or_filters=or_filters,
+			fields=get_item_query_fields(),
 			limit_start=limit_start,
 			limit_page_length=limit_page_length,
-			order_by="item_name asc",
+			search_value=search_value if use_limit_search else None,
+			in_stock_warehouse=warehouse if posa_display_items_in_stock and warehouse else None,
 		)
-		
-		# Sort results to prioritize exact matches for better UX
-		if use_limit_search and search_value and items_data:
-			search_lower = search_value.lower()
-			def sort_priority(item):
-				item_code_lower = item.get("item_code", "").lower()
-				item_name_lower = item.get("item_name", "").lower()
-				
-				# Priority 1: Exact item code match
-				if item_code_lower == search_lower:
-					return (1, item.get("item_name", ""))
-				# Priority 2: Item code starts with search
-				elif item_code_lower.startswith(search_lower):
-					return (2, item.get("item_name", ""))
-				# Priority 3: Item name starts with search
-				elif item_name_lower.startswith(search_lower):
-					return (3, item.get("item_name", ""))
-				# Priority 4: Everything else
-				else:
-					return (4, item.get("item_name", ""))
-			
-			items_data.sort(key=sort_priority)
-
-		if items_data:
-			items = [d.item_code for d in items_data]
-			price_list_currency = frappe.db.get_value("Price List", price_list, "currency")
-			item_prices_data = frappe.get_all(
-				"Item Price",
-				fields=["item_code", "price_list_rate", "currency", "uom"],
-				filters={
-					"price_list": price_list,
-					"item_code": ["in", items],
-					"currency": price_list_currency or pos_profile.get("currency"),
-					"selling": 1,
-					"valid_from": ["<=", today],
-					"customer": ["in", ["", None, customer]],
-				},
-				or_filters=[
-					["valid_upto", ">=", today],
-					["valid_upto", "in", ["", None]],
-				],
-				order_by="valid_from ASC, valid_upto DESC",
-			)
-
-			item_prices = {}
-			for d in item_prices_data:
-				item_prices.setdefault(d.item_code, {})
-				item_prices[d.item_code][d.get("uom") or "None"] = d
 
-			for item in items_data:
-				item_code = item.item_code
-				item_price = {}
-				if item_prices.get(item_code):
-					item_price = (
-						item_prices.get(item_code).get(item.stock_uom)
-						or item_prices.get(item_code).get("None")
-						or {}
-					)
-				item_barcode = frappe.get_all(
-					"Item Barcode",
-					filters={"parent": item_code},
-					fields=["barcode", "posa_uom"],
-				)
-				batch_no_data = []
-				if search_batch_no or item.has_batch_no:
-					batch_list = get_batch_qty(warehouse=warehouse, item_code=item_code)
-					if batch_list:
-						for batch in batch_list:
-							if batch.qty > 0 and batch.batch_no:
-								batch_doc = frappe.get_cached_doc("Batch", batch.batch_no)
-								if (
-									str(batch_doc.expiry_date) > str(today)
-									or batch_doc.expiry_date in ["", None]
-								) and batch_doc.disabled == 0:
-									batch_no_data.append(
-										{
-											"batch_no": batch.batch_no,
-											"batch_qty": batch.qty,
-											"expiry_date": batch_doc.expiry_date,
-											"batch_price": batch_doc.posa_batch_price,
-											"manufacturing_date": batch_doc.manufacturing_date,
-										}
-									)
-				serial_no_data = []
-				if search_serial_no or item.has_serial_no:
-					serial_no_data = frappe.get_all(
-						"Serial No",
-						filters={
-							"item_code": item_code,
-							"status": "Active",
-							"warehouse": warehouse,
-						},
-						fields=["name as serial_no"],
-					)
-				# Fetch UOM conversion details for the item
-				uoms = frappe.get_all(
-					"UOM Conversion Detail",
-					filters={"parent": item_code},
-					fields=["uom", "conversion_factor"],
-				)
-				stock_uom = item.stock_uom
-				if stock_uom and not any(u.get("uom") == stock_uom for u in uoms):
-					uoms.append({"uom": stock_uom, "conversion_factor": 1.0})
-				item_stock_qty = 0
-				if pos_profile.get("posa_display_items_in_stock") or use_limit_search:
-					item_stock_qty = get_stock_availability(item_code, pos_profile.get("warehouse"))
-				
-				# Fetch customer rate if enabled and customer is provided
-				customer_rate = 0
-				if pos_profile.get("custom_show_last_custom_rate") and customer:
-					customer_rate_result = frappe.db.sql("""
-						SELECT sii.rate 
-						FROM `tabSales Invoice Item` sii 
-						INNER JOIN `tabSales Invoice` si ON si.name = sii.parent 
-						WHERE si.customer = %s AND sii.item_code = %s AND si.docstatus = 1 
-						ORDER BY si.posting_date DESC, si.creation DESC 
-						LIMIT 1
-					""", (customer, item_code), as_dict=True)
-					if customer_rate_result:
-						customer_rate = customer_rate_result[0].get("rate", 0)
-				
-				attributes = ""
-				if pos_profile.get("posa_show_template_items") and item.has_variants:
-					attributes = get_item_attributes(item.item_code)
-				item_attributes = ""
-				if pos_profile.get("posa_show_template_items") and item.variant_of:
-					item_attributes = frappe.get_all(
-						"Item Variant Attribute",
-						fields=["attribute", "attribute_value"],
-						filters={"parent": item.item_code, "parentfield": "attributes"},
-					)
-				if posa_display_items_in_stock and (not item_stock_qty or item_stock_qty < 0):
-					pass
-				else:
-					row = {}
-					row.update(item)
-					row.update(
-						{
-							"rate": item_price.get("price_list_rate") or 0,
-							"currency": item_price.get("currency")
-							or price_list_currency
-							or pos_profile.get("currency"),
-							"item_barcode": item_barcode or [],
-							"actual_qty": item_stock_qty or 0,
-							"serial_no_data": serial_no_data or [],
-							"batch_no_data": batch_no_data or [],
-							"attributes": attributes or "",
-							"item_attributes": item_attributes or "",
-							"item_uoms": uoms or [],
-							"customer_rate": customer_rate or 0,
-							"last_customer_rate": customer_rate or 0,
-						}
-					)
-					result.append(row)
+		# Prices, barcodes, UOMs, stock and customer rates are read for the
+		# whole page in a fixed number of queries
+		result = enrich_items(
+			items_data, pos_profile, price_list, customer=customer, use_limit_search=use_limit_search
+		)
+		for row in result:
+			row["customer_rate"] = row["last_customer_rate"]
 		return result
 
 	if use_price_list:
@@ -527,7 +378,7 @@ def get_items(
 
 def get_item_group_condition(pos_profile):
 	cond = " and 1=1"
-	item_groups = get_item_groups(pos_profile)
+	item_groups = get_pos_context(pos_profile).escaped_item_groups
 	if item_groups:
 		cond = " and item_group in (%s)" % (", ".join(["%s"] * len(item_groups)))
 
@@ -557,28 +408,9 @@ def get_items_groups():
 
 
 def get_customer_groups(pos_profile):
-	customer_groups = []
-	if pos_profile.get("customer_groups"):
-		# Get items based on the item groups defined in the POS profile
-		for data in pos_profile.get("customer_groups"):
-			customer_groups.extend(
-				[
-					"%s" % frappe.db.escape(d.get("name"))
-					for d in get_child_nodes("Customer Group", data.get("customer_group"))
-				]
-			)
-
-	return list(set(customer_groups))
-
-
-def get_child_nodes(group_type, root):
-	lft, rgt = frappe.db.get_value(group_type, root, ["lft", "rgt"])
-	return frappe.get_all(
-		group_type,
-		filters={"lft": [">=", lft], "rgt": ["<=", rgt]},
-		fields=["name", "lft", "rgt"],
-		order_by="lft",
-	)
+	return [
+		frappe.db.escape(name) for name in get_profile_groups(pos_profile.get("name"), "Customer Group")
+	]
 
 
 def get_customer_group_condition(pos_profile):
@@ -1223,7 +1055,7 @@ def delete_invoice(invoice):
 
 @frappe.whitelist()
 def get_items_details(pos_profile, items_data, price_list=None):
-	_pos_profile = json.loads(pos_profile)
+	_pos_profile = get_pos_context(pos_profile)
 	ttl = _pos_profile.get("posa_server_cache_duration")
 	if ttl:
 		ttl = int(ttl) * 60
@@ -1234,7 +1066,7 @@ def get_items_details(pos_profile, items_data, price_list=None):
 
 	def _get_items_details(pos_profile, items_data, price_list=None):
 		today = nowdate()
-		pos_profile = json.loads(pos_profile)
+		pos_profile = get_pos_context(pos_profile)
 		items_data = json.loads(items_data)
 		warehouse = pos_profile.get("warehouse")
 		result = []
@@ -1244,7 +1076,7 @@ def get_items_details(pos_profile, items_data, price_list=None):
 
 		item_codes = [item.get("item_code") for item in items_data]
 
-		price_list_currency = frappe.db.get_value("Price List", price_list, "currency")
+		price_list_currency = pos_profile.get_price_list_currency(price_list)
 		item_prices_data = frappe.get_all(
 			"Item Price",
 			fields=["item_code", "price_list_rate", "currency", "uom"],
@@ -1273,62 +1105,30 @@ def get_items_details(pos_profile, items_data, price_list=None):
 		except Exception as e:
 			frappe.log_error(f"Error clearing bin_qty_cache: {str(e)}", "POS Awesome")
 
+		item_docs = {
+			d.name: d
+			for d in frappe.get_all(
+				"Item",
+				filters={"name": ["in", item_codes]},
+				fields=["name", "stock_uom", "has_batch_no", "has_serial_no"],
+			)
+		}
+		stock_qty = get_stock_qty_map(item_codes, warehouse)
+		uoms_map = get_uoms_map(item_codes)
+		serial_counts = get_serial_counts_map(item_codes, warehouse)
+		batches_map = get_batch_data_map(item_codes, warehouse)
+
 		if len(items_data) > 0:
 			for item in items_data:
 				item_code = item.get("item_code")
+				item_doc = item_docs.get(item_code) or frappe._dict()
 
-				item_stock_qty = get_stock_availability(item_code, warehouse)
-				(has_batch_no, has_serial_no) = frappe.db.get_value(
-					"Item", item_code, ["has_batch_no", "has_serial_no"]
-				)
-				uoms = frappe.get_all(
-					"UOM Conversion Detail",
-					filters={"parent": item_code},
-					fields=["uom", "conversion_factor"],
-				)
-
-				# Add stock UOM if not already in uoms list
-				stock_uom = frappe.db.get_value("Item", item_code, "stock_uom")
-				if stock_uom:
-					stock_uom_exists = False
-					for uom_data in uoms:
-						if uom_data.get("uom") == stock_uom:
-							stock_uom_exists = True
-							break
-
-					if not stock_uom_exists:
-						uoms.append({"uom": stock_uom, "conversion_factor": 1.0})
-
-				serial_no_data = frappe.get_all(
-					"Serial No",
-					filters={
-						"item_code": item_code,
-						"status": "Active",
-						"warehouse": warehouse,
-					},
-					fields=["name as serial_no"],
-				)
-
-				batch_no_data = []
-
-				batch_list = get_batch_qty(warehouse=warehouse, item_code=item_code)
-
-				if batch_list:
-					for batch in batch_list:
-						if batch.qty > 0 and batch.batch_no:
-							batch_doc = frappe.get_cached_doc("Batch", batch.batch_no)
-							if (
-								str(batch_doc.expiry_date) > str(today) or batch_doc.expiry_date in ["", None]
-							) and batch_doc.disabled == 0:
-								batch_no_data.append(
-									{
-										"batch_no": batch.batch_no,
-										"batch_qty": batch.qty,
-										"expiry_date": batch_doc.expiry_date,
-										"batch_price": batch_doc.posa_batch_price,
-										"manufacturing_date": batch_doc.manufacturing_date,
-									}
-								)
+				item_stock_qty = stock_qty.get(item_code, 0.0)
+				has_batch_no, has_serial_no = item_doc.has_batch_no, item_doc.has_serial_no
+				stock_uom = item_doc.stock_uom
+				uoms = with_stock_uom(uoms_map.get(item_code), stock_uom)
+				serial_no_count = serial_counts.get(item_code, 0)
+				batch_no_data = batches_map.get(item_code) or []
 
 				item_price = {}
 				if item_prices.get(item_code):
@@ -1343,7 +1143,7 @@ def get_items_details(pos_profile, items_data, price_list=None):
 				row.update(
 					{
 						"item_uoms": uoms or [],
-						"serial_no_data": serial_no_data or [],
+						"serial_no_count": serial_no_count,
 						"batch_no_data": batch_no_data or [],
 						"actual_qty": item_stock_qty or 0,
 						"has_batch_no": has_batch_no,
@@ -1369,38 +1169,13 @@ def get_items_details(pos_profile, items_data, price_list=None):
 @frappe.whitelist()
 def get_item_detail(item, doc=None, warehouse=None, price_list=None):
 	item = json.loads(item)
-	today = nowdate()
 	item_code = item.get("item_code")
 	batch_no_data = []
 	if warehouse and item.get("has_batch_no"):
-		batch_list = get_batch_qty(warehouse=warehouse, item_code=item_code)
-		if batch_list:
-			for batch in batch_list:
-				if batch.qty > 0 and batch.batch_no:
-					batch_doc = frappe.get_cached_doc("Batch", batch.batch_no)
-					if (
-						str(batch_doc.expiry_date) > str(today) or batch_doc.expiry_date in ["", None]
-					) and batch_doc.disabled == 0:
-						batch_no_data.append(
-							{
-								"batch_no": batch.batch_no,
-								"batch_qty": batch.qty,
-								"expiry_date": batch_doc.expiry_date,
-								"batch_price": batch_doc.posa_batch_price,
-								"manufacturing_date": batch_doc.manufacturing_date,
-							}
-						)
-	serial_no_data = []
+		batch_no_data = get_batch_data_map([item_code], warehouse).get(item_code) or []
+	serial_no_count = 0
 	if warehouse and item.get("has_serial_no"):
-		serial_no_data = frappe.get_all(
-			"Serial No",
-			filters={
-				"item_code": item_code,
-				"status": "Active",
-				"warehouse": warehouse,
-			},
-			fields=["name as serial_no"],
-		)
+		serial_no_count = get_serial_counts_map([item_code], warehouse).get(item_code, 0)
 
 	item["selling_price_list"] = price_list
 
@@ -1414,7 +1189,7 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None):
 		res["actual_qty"] = get_stock_availability(item_code, warehouse)
 	res["max_discount"] = max_discount
 	res["batch_no_data"] = batch_no_data
-	res["serial_no_data"] = serial_no_data
+	res["serial_no_count"] = serial_no_count
 
 	# Add UOMs data directly from item document
 	uoms = frappe.get_all(
@@ -1441,20 +1216,7 @@ def get_item_detail(item, doc=None, warehouse=None, price_list=None):
 
 
 def get_stock_availability(item_code, warehouse):
-	actual_qty = (
-		frappe.db.get_value(
-			"Stock Ledger Entry",
-			filters={
-				"item_code": item_code,
-				"warehouse": warehouse,
-				"is_cancelled": 0,
-			},
-			fieldname="qty_after_transaction",
-			order_by="posting_date desc, posting_time desc, creation desc",
-		)
-		or 0.0
-	)
-	return actual_qty
+	return get_stock_qty_map([item_code], warehouse).get(item_code, 0.0)
 
 
 @frappe.whitelist()
@@ -1955,7 +1717,11 @@ def get_app_branch(app):
 
 
 @frappe.whitelist()
-def get_offers(profile):
+def get_offers(profile, version=None):
+	return with_content_version(["POS Offer", "POS Profile"], [profile], version, lambda: _get_offers(profile))
+
+
+def _get_offers(profile):
 	pos_profile = frappe.get_doc("POS Profile", profile)
 	company = pos_profile.company
 	warehouse = pos_profile.warehouse
@@ -2551,24 +2317,34 @@ def validate_return_items(return_against, items):
 
 
 @frappe.whitelist()
-def get_available_currencies():
+def get_available_currencies(version=None):
 	"""Get list of available currencies from ERPNext"""
-	return frappe.get_all(
-		"Currency",
-		fields=["name", "currency_name"],
-		filters={"enabled": 1},
-		order_by="currency_name",
+	return with_content_version(
+		["Currency"],
+		[],
+		version,
+		lambda: frappe.get_all(
+			"Currency",
+			fields=["name", "currency_name"],
+			filters={"enabled": 1},
+			order_by="currency_name",
+		),
 	)
 
 
 @frappe.whitelist()
-def get_selling_price_lists():
+def get_selling_price_lists(version=None):
 	"""Return all selling price lists"""
-	return frappe.get_all(
-		"Price List",
-		filters={"selling": 1},
-		fields=["name"],
-		order_by="name",
+	return with_content_version(
+		["Price List"],
+		[],
+		version,
+		lambda: frappe.get_all(
+			"Price List",
+			filters={"selling": 1},
+			fields=["name"],
+			order_by="name",
+		),
 	)
 
 
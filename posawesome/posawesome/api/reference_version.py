@@ -0,0 +1,83 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Content versions for POS reference data endpoints.
+
+Item groups, offers, price lists, currencies, translations and customers
+change rarely, but tills poll them many times per shift. Each source doctype
+has a version token in Redis, replaced whenever one of its documents is saved,
+deleted or renamed. An endpoint's content version combines the tokens it
+depends on, its arguments and the date. A client that sends back the version
+it already holds gets ``{"version": v, "not_modified": 1}`` without the
+payload being rebuilt.
+"""
+
+import hashlib
+
+import frappe
+from frappe.utils import cstr, nowdate
+
+REFERENCE_VERSIONS_KEY = "posa_reference_versions"
+
+# Doctypes whose changes invalidate reference payloads; each one registers
+# on_reference_change in doc_events of hooks.py
+TRACKED_DOCTYPES = {
+	"Item Group",
+	"Customer",
+	"Customer Group",
+	"POS Profile",
+	"POS Offer",
+	"Price List",
+	"Currency",
+	"Translation",
+}
+
+
+def get_doctype_version(doctype):
+	version = frappe.cache().hget(REFERENCE_VERSIONS_KEY, doctype)
+	if not version:
+		version = frappe.generate_hash(length=10)
+		frappe.cache().hset(REFERENCE_VERSIONS_KEY, doctype, version)
+	return version
+
+
+def get_content_version(doctypes, *args):
+	"""Return the content version of a payload built from ``doctypes`` and ``args``."""
+	# The date is part of the key so date-bound payloads such as offers
+	# roll over, and every payload is re-sent at least once a day.
+	parts = [get_doctype_version(d) for d in doctypes] + [nowdate()] + [cstr(a) for a in args]
+	return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def with_content_version(doctypes, args, version, build):
+	"""Return ``build()`` wrapped with its content version.
+
+	When ``version`` is ``None`` the payload is returned as before. Otherwise
+	the reply is ``{"version", "data"}``, or ``{"version", "not_modified"}``
+	when ``version`` is already current.
+	"""
+	if version is None:
+		return build()
+	current = get_content_version(doctypes, *args)
+	if version == current:
+		return {"version": current, "not_modified": 1}
+	return {"version": current, "data": build()}
+
+
+def clear_reference_version(doctype):
+	"""Replace the version token of ``doctype`` once the transaction commits.
+
+	For writes that bypass doc events. Dropping the token before commit would
+	let a till cache the old payload under the new version.
+	"""
+	frappe.db.after_commit.add(lambda: frappe.cache().hdel(REFERENCE_VERSIONS_KEY, doctype))
+
+
+def on_reference_change(doc, method=None, *args, **kwargs):
+	if doc.doctype in TRACKED_DOCTYPES:
+		clear_reference_version(doc.doctype)
+
+
+def clear_reference_versions():
+	"""Invalidate every content version; run after migrate for new translations."""
+	frappe.cache().delete_key(REFERENCE_VERSIONS_KEY)
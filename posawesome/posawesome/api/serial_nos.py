@@ -0,0 +1,122 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Paged serial number lookup for one item and warehouse.
+
+Item payloads only carry ``serial_no_count``. The till pages and prefix
+searches Active serials here, validates scanned serials in bulk and resolves
+serials scanned into the item search to their items. Paging and prefix
+search run on the ``(item_code, warehouse, status, name)`` index of Serial
+No, so they are a range scan however many serials the item holds.
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+SERIAL_PAGE_SIZE = 50
+MAX_SERIAL_PAGE_SIZE = 500
+MAX_VALIDATE_SERIALS = 1000
+
+
+@frappe.whitelist()
+def search_serial_nos(item_code, warehouse, txt=None, after=None, page_length=SERIAL_PAGE_SIZE):
+	"""Return ``{serial_nos, has_more}`` of Active serials starting with ``txt``.
+
+	Serials are in name order; pass the last one received as ``after`` for the
+	next page.
+	"""
+	if not item_code or not warehouse:
+		return {"serial_nos": [], "has_more": 0}
+	page_length = min(max(cint(page_length) or SERIAL_PAGE_SIZE, 1), MAX_SERIAL_PAGE_SIZE)
+
+	conditions = ["item_code = %(item_code)s", "warehouse = %(warehouse)s", "status = 'Active'"]
+	values = {"item_code": item_code, "warehouse": warehouse, "limit": page_length + 1}
+	if txt:
+		conditions.append("name LIKE %(txt)s")
+		values["txt"] = txt.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+	if after:
+		conditions.append("name > %(after)s")
+		values["after"] = after
+
+	serial_nos = frappe.db.sql_list(
+		f"""
+		SELECT name
+		FROM `tabSerial No`
+		WHERE {" AND ".join(conditions)}
+		ORDER BY name
+		LIMIT %(limit)s
+		""",
+		values,
+	)
+	return {"serial_nos": serial_nos[:page_length], "has_more": int(len(serial_nos) > page_length)}
+
+
+@frappe.whitelist()
+def validate_serial_nos(item_code, warehouse, serial_nos):
+	"""Check scanned ``serial_nos`` for ``item_code`` in ``warehouse`` in one query.
+
+	Returns ``{valid, invalid}`` where each invalid entry carries the reason.
+	"""
+	serial_nos = json.loads(serial_nos) if isinstance(serial_nos, str) else serial_nos
+	serial_nos = [s.strip() for s in serial_nos or [] if s and s.strip()]
+	if len(serial_nos) > MAX_VALIDATE_SERIALS:
+		frappe.throw(_("At most {0} serial numbers can be validated at once").format(MAX_VALIDATE_SERIALS))
+	if not serial_nos:
+		return {"valid": [], "invalid": []}
+
+	found = {
+		row.name: row
+		for row in frappe.get_all(
+			"Serial No",
+			filters={"name": ["in", list(set(serial_nos))]},
+			fields=["name", "item_code", "warehouse", "status"],
+		)
+	}
+
+	valid, invalid, seen = [], [], set()
+	for serial_no in serial_nos:
+		row = found.get(serial_no)
+		if serial_no in seen:
+			reason = _("Scanned more than once")
+		elif not row:
+			reason = _("Serial No does not exist")
+		elif row.item_code != item_code:
+			reason = _("Serial No belongs to item {0}").format(row.item_code)
+		elif row.warehouse != warehouse:
+			reason = _("Serial No is not in warehouse {0}").format(warehouse)
+		elif row.status != "Active":
+			reason = _("Serial No is {0}").format(row.status)
+		else:
+			reason = None
+		seen.add(serial_no)
+		if reason:
+			invalid.append({"serial_no": serial_no, "reason": reason})
+		else:
+			valid.append(serial_no)
+	return {"valid": valid, "invalid": invalid}
+
+
+@frappe.whitelist()
+def get_serial_no_items(serial_nos, warehouse=None):
+	"""Return ``{serial_no: item_code}`` of the Active ``serial_nos``, in ``warehouse`` if given.
+
+	Lets the till add the right item when a serial number is scanned into the
+	item search, since item payloads do not carry serials.
+	"""
+	serial_nos = json.loads(serial_nos) if isinstance(serial_nos, str) else serial_nos
+	serial_nos = list({s.strip() for s in serial_nos or [] if s and s.strip()})
+	if len(serial_nos) > MAX_VALIDATE_SERIALS:
+		frappe.throw(_("At most {0} serial numbers can be looked up at once").format(MAX_VALIDATE_SERIALS))
+	if not serial_nos:
+		return {}
+
+	filters = {"name": ["in", serial_nos], "status": "Active"}
+	if warehouse:
+		filters["warehouse"] = warehouse
+	return {
+		row.name: row.item_code
+		for row in frappe.get_all("Serial No", filters=filters, fields=["name", "item_code"])
+	}
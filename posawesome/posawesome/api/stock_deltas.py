@@ -0,0 +1,91 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Realtime stock deltas for POS terminals.
+
+Submitting a Stock Ledger Entry marks its item and warehouse dirty in a Redis
+set. The first mark after a quiet spell opens a ``STOCK_DELTA_WINDOW`` second
+window in Redis and queues one publish job after commit; marks inside an
+open window only add to the set. What they leave is published by the next
+mark after the window closes or by the scheduler flush, so a burst costs one
+job per window and nothing sleeps in a worker. The job drains the set, reads
+the dirty items' Bins and publishes one ``posa_stock_delta`` event per
+warehouse with ``[[item_code, actual_qty], ...]``. Events go to the
+Warehouse document room, so a till only receives the warehouse of its
+profile after subscribing to it.
+"""
+
+from collections import defaultdict
+
+import frappe
+from frappe.utils.background_jobs import enqueue
+
+STOCK_DELTA_KEY = "posa_stock_dirty"
+STOCK_DELTA_EVENT = "posa_stock_delta"
+STOCK_DELTA_WINDOW_KEY = "posa_stock_delta_window"
+STOCK_DELTA_WINDOW = 5
+
+
+def mark_stock_dirty(item_code, warehouse):
+	if not item_code or not warehouse:
+		return
+	cache = frappe.cache()
+	cache.sadd(STOCK_DELTA_KEY, f"{warehouse}::{item_code}")
+	if not cache.set(cache.make_key(STOCK_DELTA_WINDOW_KEY), 1, nx=True, ex=STOCK_DELTA_WINDOW):
+		return
+	enqueue(
+		"posawesome.posawesome.api.stock_deltas.publish_stock_deltas",
+		queue="short",
+		job_id="posa_publish_stock_deltas",
+		deduplicate=True,
+		enqueue_after_commit=True,
+	)
+
+
+def on_stock_ledger_entry_submit(doc, method=None):
+	mark_stock_dirty(doc.item_code, doc.warehouse)
+
+
+def on_bin_update(doc, method=None):
+	mark_stock_dirty(doc.item_code, doc.warehouse)
+
+
+def _pop_dirty():
+	members = frappe.cache().smembers(STOCK_DELTA_KEY)
+	if members:
+		frappe.cache().srem(STOCK_DELTA_KEY, *members)
+	dirty = defaultdict(set)
+	for member in members or []:
+		warehouse, item_code = frappe.safe_decode(member).split("::", 1)
+		dirty[warehouse].add(item_code)
+	return dirty
+
+
+def publish_stock_deltas():
+	"""Publish the current quantities of every dirty item, per warehouse."""
+	# Items marked while this job runs are not queued again, so drain until empty
+	while dirty := _pop_dirty():
+		for warehouse, item_codes in dirty.items():
+			rows = dict(
+				frappe.db.sql(
+					"""
+					SELECT item_code, actual_qty
+					FROM `tabBin`
+					WHERE warehouse = %(warehouse)s
+					AND item_code IN %(item_codes)s
+					""",
+					{"warehouse": warehouse, "item_codes": tuple(item_codes)},
+				)
+			)
+			frappe.publish_realtime(
+				STOCK_DELTA_EVENT,
+				{"warehouse": warehouse, "items": [[code, rows.get(code, 0)] for code in sorted(item_codes)]},
+				doctype="Warehouse",
+				docname=warehouse,
+			)
+
+
+def flush_stock_deltas():
+	"""Publish what marks inside a window left dirty; runs on every scheduler tick."""
+	if frappe.cache().smembers(STOCK_DELTA_KEY):
+		publish_stock_deltas()
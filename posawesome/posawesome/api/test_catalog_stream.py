@@ -0,0 +1,46 @@
+# Copyright (c) 2025, Youssef Restom and Contributors
+# See license.txt
+
+import json
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from posawesome.posawesome.api.catalog_stream import stream_items
+
+
+def read_lines(response):
+	body = b"".join(
+		chunk.encode() if isinstance(chunk, str) else chunk for chunk in response.response
+	).decode()
+	return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+class TestCatalogStream(FrappeTestCase):
+	def setUp(self):
+		self.pos_profile = frappe.db.get_value("POS Profile", {"disabled": 0}, "name")
+		if not self.pos_profile:
+			self.skipTest("No POS Profile on this site")
+
+	def assert_complete(self, lines):
+		self.assertTrue(lines)
+		self.assertEqual(lines[-1].get("done"), 1)
+		self.assertEqual(lines[-1]["item_count"], len(lines) - 1)
+		self.assertTrue(all(row.get("item_code") for row in lines[:-1]))
+
+	def test_stream_body_within_request(self):
+		self.assert_complete(read_lines(stream_items(self.pos_profile, batch_size=2)))
+
+	def test_stream_body_after_request_teardown(self):
+		# The server reads the body after frappe.destroy() ran for the request
+		response = stream_items(self.pos_profile, batch_size=2)
+		site, sites_path = frappe.local.site, frappe.local.sites_path
+		frappe.db.commit()
+		frappe.destroy()
+		try:
+			lines = read_lines(response)
+		finally:
+			frappe.init(site=site, sites_path=sites_path)
+			frappe.connect()
+			frappe.set_user("Administrator")
+		self.assert_complete(lines)
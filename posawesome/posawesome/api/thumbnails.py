@@ -0,0 +1,124 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Resized item image thumbnails for the card view.
+
+Thumbnails of public item images are written once to
+``public/files/posa_thumbnails`` as WebP (JPEG where Pillow lacks WebP
+support) and then served as static files. They are generated when an image
+is uploaded or, failing that, on the first request for them through
+``get_thumbnail``.
+"""
+
+import hashlib
+import os
+from urllib.parse import quote
+
+import frappe
+from frappe import _
+from frappe.utils.background_jobs import enqueue
+from werkzeug.utils import redirect
+
+THUMBNAIL_DIR = "posa_thumbnails"
+THUMBNAIL_SIZE = 256
+THUMBNAIL_QUALITY = 75
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp")
+
+_thumbnail_format = None
+
+
+def get_thumbnail_format():
+	global _thumbnail_format
+	if _thumbnail_format is None:
+		from PIL import features
+
+		_thumbnail_format = "webp" if features.check("webp") else "jpeg"
+	return _thumbnail_format
+
+
+def _source_path(image_url):
+	"""Return the disk path of a public ``/files/`` image, or ``None``."""
+	if not image_url or not image_url.startswith("/files/"):
+		return None
+	path = image_url.split("?", 1)[0]
+	if not path.lower().endswith(IMAGE_EXTENSIONS):
+		return None
+	files_dir = os.path.realpath(frappe.get_site_path("public", "files"))
+	source = os.path.realpath(frappe.get_site_path("public", path.lstrip("/")))
+	if not source.startswith(files_dir + os.sep):
+		return None
+	return source
+
+
+def _thumbnail_name(image_url):
+	digest = hashlib.sha1(image_url.encode()).hexdigest()[:20]
+	extension = "jpg" if get_thumbnail_format() == "jpeg" else get_thumbnail_format()
+	return f"{digest}-{THUMBNAIL_SIZE}.{extension}"
+
+
+def _thumbnail_path(image_url):
+	return frappe.get_site_path("public", "files", THUMBNAIL_DIR, _thumbnail_name(image_url))
+
+
+def make_thumbnail(image_url):
+	"""Write the thumbnail of ``image_url`` if missing and return its URL, or ``None``."""
+	source = _source_path(image_url)
+	if not source or not os.path.exists(source):
+		return None
+
+	target = _thumbnail_path(image_url)
+	if not os.path.exists(target):
+		from PIL import Image, ImageOps
+
+		os.makedirs(os.path.dirname(target), exist_ok=True)
+		with Image.open(source) as image:
+			image = ImageOps.exif_transpose(image)
+			image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+			if get_thumbnail_format() == "jpeg" and image.mode not in ("RGB", "L"):
+				image = image.convert("RGB")
+			# Write under a temporary name so concurrent requests never serve
+			# a partial file
+			partial = f"{target}.{frappe.generate_hash(length=6)}.tmp"
+			image.save(partial, get_thumbnail_format(), quality=THUMBNAIL_QUALITY)
+			os.replace(partial, target)
+
+	return f"/files/{THUMBNAIL_DIR}/{_thumbnail_name(image_url)}"
+
+
+def get_thumbnail_url(image_url):
+	"""Return the URL the card view should load for ``image_url``.
+
+	That is the static thumbnail when it exists, the ``get_thumbnail``
+	endpoint when it still has to be generated, and ``image_url`` itself for
+	images that are not thumbnailed (external or private files).
+	"""
+	if not _source_path(image_url):
+		return image_url
+	if os.path.exists(_thumbnail_path(image_url)):
+		return f"/files/{THUMBNAIL_DIR}/{_thumbnail_name(image_url)}"
+	return "/api/method/posawesome.posawesome.api.thumbnails.get_thumbnail?src=" + quote(image_url, safe="")
+
+
+@frappe.whitelist()
+def get_thumbnail(src):
+	"""Generate the thumbnail of ``src`` if needed and redirect to it."""
+	if not _source_path(src):
+		frappe.throw(_("Thumbnails are only available for public images"))
+	try:
+		location = make_thumbnail(src) or src
+	except Exception:
+		frappe.log_error(f"Failed to create thumbnail for {src}", "POS Awesome")
+		location = src
+	return redirect(location, code=302)
+
+
+def on_file_insert(doc, method=None):
+	"""Pre-generate thumbnails for images uploaded to Items."""
+	if doc.attached_to_doctype != "Item" or doc.is_private or not _source_path(doc.file_url):
+		return
+	enqueue(
+		"posawesome.posawesome.api.thumbnails.make_thumbnail",
+		queue="short",
+		image_url=doc.file_url,
+		enqueue_after_commit=True,
+	)
@@ -11,6 +11,10 @@ import time
 import os
 import psutil
 
+from posawesome.posawesome.api import group_tree
+from posawesome.posawesome.api.group_tree import get_profile_groups
+from posawesome.posawesome.api.reference_version import with_content_version
+
 def get_version():
 	branch_name = get_app_branch("erpnext")
 	if "12" in branch_name:
@@ -48,18 +52,12 @@ def get_root_of(doctype):
 
 
 def get_child_nodes(group_type, root):
-	lft, rgt = frappe.db.get_value(group_type, root, ["lft", "rgt"])
-	return frappe.get_all(
-		group_type,
-		filters={"lft": [">=", lft], "rgt": ["<=", rgt]},
-		fields=["name", "lft", "rgt"],
-		order_by="lft",
-	)
+	return group_tree.get_child_nodes(group_type, root)
 
 
 def get_item_group_condition(pos_profile):
 	cond = " and 1=1"
-	item_groups = get_item_groups(pos_profile)
+	item_groups = [frappe.db.escape(g) for g in get_profile_groups(pos_profile, "Item Group")]
 	if item_groups:
 		cond = " and item_group in (%s)" % (", ".join(["%s"] * len(item_groups)))
 
@@ -120,13 +118,18 @@ def get_company_domain(company):
 
 
 @frappe.whitelist()
-def get_selling_price_lists():
+def get_selling_price_lists(version=None):
 	"""Return all selling price lists"""
-	return frappe.get_all(
-		"Price List",
-		filters={"selling": 1},
-		fields=["name"],
-		order_by="name",
+	return with_content_version(
+		["Price List"],
+		[],
+		version,
+		lambda: frappe.get_all(
+			"Price List",
+			filters={"selling": 1},
+			fields=["name"],
+			order_by="name",
+		),
 	)
 
 
@@ -213,8 +216,12 @@ def get_language_options():
 
 
 @frappe.whitelist()
-def get_translation_dict(lang: str) -> dict:
+def get_translation_dict(lang: str, version: str = None) -> dict:
 	"""Return translations for the given language from all installed apps."""
+	return with_content_version(["Translation"], [lang], version, lambda: _get_translation_dict(lang))
+
+
+def _get_translation_dict(lang: str) -> dict:
 	from frappe.translate import get_translations_from_csv
 
 	if lang == "en":
@@ -1,5 +1,27 @@
 from __future__ import annotations
+import base64
+import json
+
 import frappe
+from frappe import _
+
+def encode_cursor(*values):
+	"""Return an opaque keyset pagination cursor for the given sort key values."""
+	return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+	"""Return the sort key values stored in ``cursor`` or ``None`` for the first page."""
+	if not cursor:
+		return None
+	try:
+		values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+	except (ValueError, TypeError):
+		values = None
+	if not isinstance(values, list) or not values:
+		frappe.throw(_("Invalid pagination cursor"))
+	return values
+
 
 @frappe.whitelist()
 def get_active_pos_profile(user=None):
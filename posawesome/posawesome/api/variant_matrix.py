@@ -0,0 +1,141 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+"""Precomputed variant matrix per template item.
+
+The matrix holds the template's attributes and their values, an
+``attribute -> value -> [variant codes]`` index and the item rows of every
+enabled variant (barcodes and UOMs included). It is built with a fixed
+number of queries, kept in Redis and dropped whenever a variant, the
+template or an Item Attribute changes.
+"""
+
+import frappe
+
+from posawesome.posawesome.api.item_enrichment import ITEM_FIELDS, get_barcodes_map, get_uoms_map, with_stock_uom
+
+VARIANT_MATRIX_KEY = "posa_variant_matrix"
+
+
+def _value_sort_key(value):
+	try:
+		return (0, float(value), value)
+	except ValueError:
+		return (1, 0, value)
+
+
+def build_variant_matrix(template):
+	"""Build and cache the variant matrix of ``template``."""
+	attributes = frappe.get_all(
+		"Item Variant Attribute",
+		filters={"parent": template, "parenttype": "Item", "parentfield": "attributes"},
+		pluck="attribute",
+		order_by="idx asc",
+	)
+	variants = frappe.get_all(
+		"Item",
+		filters={"variant_of": template, "disabled": 0},
+		fields=ITEM_FIELDS,
+		order_by="item_name asc",
+	)
+	variant_codes = [d.item_code for d in variants]
+
+	item_attributes = {}
+	index = {attribute: {} for attribute in attributes}
+	if variant_codes:
+		for row in frappe.get_all(
+			"Item Variant Attribute",
+			filters={"parent": ["in", variant_codes], "parenttype": "Item", "parentfield": "attributes"},
+			fields=["parent", "attribute", "attribute_value"],
+			order_by="idx asc",
+		):
+			item_attributes.setdefault(row.parent, []).append(
+				{"attribute": row.attribute, "attribute_value": row.attribute_value}
+			)
+			index.setdefault(row.attribute, {}).setdefault(str(row.attribute_value), []).append(row.parent)
+
+	# Keep the attribute value order defined on Item Attribute, limited to used values
+	value_rows = {}
+	if attributes:
+		for row in frappe.get_all(
+			"Item Attribute Value",
+			filters={"parent": ["in", attributes], "parenttype": "Item Attribute"},
+			fields=["parent", "attribute_value", "abbr"],
+			order_by="idx asc",
+		):
+			value_rows.setdefault(row.parent, []).append(row)
+
+	attribute_values = []
+	for attribute in index:
+		used = index[attribute]
+		ordered = [
+			{"attribute_value": v.attribute_value, "abbr": v.abbr}
+			for v in value_rows.get(attribute, [])
+			if v.attribute_value in used
+		]
+		known = {v["attribute_value"] for v in ordered}
+		# Numeric attributes have no value rows; keep their values sorted
+		ordered.extend(
+			{"attribute_value": v, "abbr": v} for v in sorted(used, key=_value_sort_key) if v not in known
+		)
+		attribute_values.append({"attribute": attribute, "values": ordered})
+
+	barcodes = get_barcodes_map(variant_codes)
+	uoms = get_uoms_map(variant_codes)
+	rows = []
+	for variant in variants:
+		row = dict(variant)
+		row.update(
+			{
+				"item_barcode": barcodes.get(variant.item_code) or [],
+				"item_uoms": with_stock_uom(uoms.get(variant.item_code), variant.stock_uom),
+				"item_attributes": item_attributes.get(variant.item_code) or [],
+			}
+		)
+		rows.append(row)
+
+	matrix = {
+		"template": template,
+		"attributes": attribute_values,
+		"index": index,
+		"variants": rows,
+	}
+	frappe.cache().hset(VARIANT_MATRIX_KEY, template, matrix)
+	return matrix
+
+
+def get_variant_matrix(template):
+	"""Return the cached variant matrix of ``template``, building it on a miss."""
+	return frappe.cache().hget(VARIANT_MATRIX_KEY, template) or build_variant_matrix(template)
+
+
+def clear_variant_matrix(template=None):
+	if template:
+		frappe.cache().hdel(VARIANT_MATRIX_KEY, template)
+	else:
+		frappe.cache().delete_key(VARIANT_MATRIX_KEY)
+
+
+def on_item_update(doc, method=None):
+	before = doc.get_doc_before_save()
+	for template in {doc.variant_of, before.variant_of if before else None}:
+		if template:
+			clear_variant_matrix(template)
+	if doc.has_variants:
+		clear_variant_matrix(doc.name)
+
+
+def on_item_trash(doc, method=None):
+	if doc.variant_of:
+		clear_variant_matrix(doc.variant_of)
+	if doc.has_variants:
+		clear_variant_matrix(doc.name)
+
+
+def on_item_rename(doc, method=None, old=None, new=None, merge=False):
+	# Variants store their template by name, so a rename can touch any matrix
+	clear_variant_matrix()
+
+
+def on_item_attribute_update(doc, method=None):
+	clear_variant_matrix()
@@ -0,0 +1,32 @@
+# Copyright (c) 2025, Youssef Restom and Contributors
+# See license.txt
+
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.stock.doctype.item.test_item import make_item
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from posawesome.posawesome.api.customer_rates import get_last_customer_rates
+
+CUSTOMER = "_Test Customer"
+
+
+class TestPOSCustomerItemRate(FrappeTestCase):
+	def test_submit_and_cancel_recompute_last_rate(self):
+		item_code = make_item("_Test POSA Customer Rate Item", {"is_stock_item": 0}).name
+
+		def last_rate():
+			return get_last_customer_rates([item_code], CUSTOMER).get(item_code)
+
+		create_sales_invoice(customer=CUSTOMER, item_code=item_code, rate=100, posting_date=add_days(nowdate(), -2))
+		self.assertEqual(last_rate(), 100)
+
+		latest = create_sales_invoice(customer=CUSTOMER, item_code=item_code, rate=120, posting_date=nowdate())
+		self.assertEqual(last_rate(), 120)
+
+		# An older invoice submitted later does not move the last rate back
+		create_sales_invoice(customer=CUSTOMER, item_code=item_code, rate=90, posting_date=add_days(nowdate(), -5))
+		self.assertEqual(last_rate(), 120)
+
+		latest.cancel()
+		self.assertEqual(last_rate(), 100)
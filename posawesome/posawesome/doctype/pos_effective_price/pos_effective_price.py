@@ -0,0 +1,13 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class POSEffectivePrice(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("POS Effective Price", ["price_list", "item_code"], index_name="price_list_item_code")
@@ -0,0 +1,49 @@
+# Copyright (c) 2025, Youssef Restom and Contributors
+# See license.txt
+
+import frappe
+from erpnext.stock.doctype.item.test_item import make_item
+from frappe.tests.utils import FrappeTestCase
+
+from posawesome.posawesome.api.effective_price import get_effective_price
+
+PRICE_LIST = "Standard Selling"
+CUSTOMER = "_Test Customer"
+
+
+def make_item_price(item_code, rate, uom=None, customer=None):
+	return frappe.get_doc(
+		{
+			"doctype": "Item Price",
+			"item_code": item_code,
+			"price_list": PRICE_LIST,
+			"price_list_rate": rate,
+			"uom": uom,
+			"customer": customer,
+		}
+	).insert()
+
+
+class TestPOSEffectivePrice(FrappeTestCase):
+	def test_customer_and_uom_precedence(self):
+		item_code = make_item("_Test POSA Effective Price Item", {"is_stock_item": 0}).name
+		make_item_price(item_code, 10)
+		make_item_price(item_code, 12, uom="Nos")
+		make_item_price(item_code, 8, customer=CUSTOMER)
+
+		def rate(**kwargs):
+			return get_effective_price(item_code, PRICE_LIST, **kwargs).price_list_rate
+
+		# A price for the UOM beats one for any UOM
+		self.assertEqual(rate(uom="Nos"), 12)
+		self.assertEqual(rate(uom="Box"), 10)
+		# A customer price beats a generic one, even one for the exact UOM
+		self.assertEqual(rate(uom="Nos", customer=CUSTOMER), 8)
+		self.assertEqual(rate(uom="Nos", customer="_Test Customer 1"), 12)
+		self.assertIsNone(get_effective_price(item_code, PRICE_LIST, uom="Box", any_uom=False))
+
+	def test_falls_back_to_another_uom(self):
+		item_code = make_item("_Test POSA Effective Price Box Item", {"is_stock_item": 0}).name
+		make_item_price(item_code, 30, uom="Box")
+
+		self.assertEqual(get_effective_price(item_code, PRICE_LIST, uom="Nos").price_list_rate, 30)
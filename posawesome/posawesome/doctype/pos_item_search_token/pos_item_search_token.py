@@ -0,0 +1,13 @@
+# Copyright (c) 2025, Youssef Restom and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class POSItemSearchToken(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("POS Item Search Token", ["token", "item_code", "weight"], index_name="token_item_code_weight")
@@ -0,0 +1,38 @@
+# Copyright (c) 2025, Youssef Restom and Contributors
+# See license.txt
+
+from erpnext.stock.doctype.item.test_item import make_item
+from frappe.tests.utils import FrappeTestCase
+
+from posawesome.posawesome.api.item_search import index_items, search_item_codes
+
+ITEMS = {
+	"_POSA-SRCH-RW": "Red Widget",
+	"_POSA-SRCH-RG": "Red Gadget",
+	"_POSA-SRCH-BW": "Blue Widget",
+	"WIDGX-POSA-LAMP": "Desk Lamp",
+}
+
+
+class TestPOSItemSearchToken(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		for item_code, item_name in ITEMS.items():
+			make_item(item_code, {"item_name": item_name, "is_stock_item": 0})
+		index_items(list(ITEMS))
+
+	def search(self, term):
+		return [code for code in search_item_codes(term) if code in ITEMS]
+
+	def test_every_token_must_match(self):
+		self.assertEqual(self.search("red widget"), ["_POSA-SRCH-RW"])
+		self.assertEqual(self.search("widget blue"), ["_POSA-SRCH-BW"])
+		self.assertEqual(sorted(self.search("red")), ["_POSA-SRCH-RG", "_POSA-SRCH-RW"])
+		self.assertEqual(self.search("red lamp"), [])
+
+	def test_item_code_match_outranks_item_name_match(self):
+		# "widgx" is a prefix of the code of the lamp, "widg" also of two names
+		results = self.search("widg")
+		self.assertEqual(results[0], "WIDGX-POSA-LAMP")
+		self.assertEqual(sorted(results[1:]), ["_POSA-SRCH-BW", "_POSA-SRCH-RW"])
@@ -143,23 +143,20 @@ function loadTranslations(lang) {
 	const language = lang || frappe.boot.lang;
 	return new Promise((resolve) => {
 		if (navigator.onLine) {
-			frappe.call({
-				method: "posawesome.posawesome.api.utilities.get_translation_dict",
-				args: { lang: language },
-				callback: function (r) {
-					if (!r.exc && r.message) {
-						$.extend(frappe._messages, r.message);
-						import("/assets/posawesome/js/offline/index.js")
-							.then((m) => {
-								if (m && m.saveTranslationsCache) {
-									m.saveTranslationsCache(language, r.message);
-								}
-							})
-							.catch(() => {});
-					}
-					resolve();
-				},
-			});
+			// Send the cached content version so unchanged translations are not re-sent
+			import("/assets/posawesome/js/offline/index.js")
+				.then((m) =>
+					m.fetchVersioned("posawesome.posawesome.api.utilities.get_translation_dict", {
+						lang: language,
+					}).then((messages) => {
+						if (messages) {
+							$.extend(frappe._messages, messages);
+							m.saveTranslationsCache(language, messages);
+						}
+					}),
+				)
+				.catch(() => {})
+				.finally(() => resolve());
 		} else {
 			import("/assets/posawesome/js/offline/index.js")
 				.then((m) => {
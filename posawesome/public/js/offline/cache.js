@@ -37,6 +37,8 @@ export const memory = {
 	item_groups_cache: [],
 	items_last_sync: null,
 	customers_last_sync: null,
+	catalog_snapshot_versions: {},
+	reference_data_cache: {},
 	// Track the current cache schema version
 	cache_version: CACHE_VERSION,
 	cache_ready: false,
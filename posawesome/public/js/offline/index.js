@@ -105,6 +105,16 @@ export {
 	searchStoredItems,
 } from "./items.js";
 
+export {
+	downloadCatalogSnapshot,
+	getCatalogSnapshotVersion,
+	setCatalogSnapshotVersion,
+} from "./snapshot.js";
+
+export { streamCatalogItems } from "./stream.js";
+
+export { fetchVersioned, getReferenceCache, saveReferenceCache } from "./reference.js";
+
 export { saveItemGroups, getCachedItemGroups, clearItemGroups } from "./item_groups.js";
 
 // Customers exports
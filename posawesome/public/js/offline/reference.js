@@ -0,0 +1,48 @@
+import { memory } from "./cache.js";
+import { persist } from "./core.js";
+
+// Reference data endpoints (item groups, offers, price lists, currencies,
+// translations) accept the content version the client already holds and
+// answer { not_modified: 1 } when it is current, so the cached payload is
+// reused instead of being downloaded again.
+
+export function getReferenceCache(key) {
+	try {
+		const cache = memory.reference_data_cache || {};
+		return cache[key] || null;
+	} catch (e) {
+		return null;
+	}
+}
+
+export function saveReferenceCache(key, version, data) {
+	try {
+		const cache = memory.reference_data_cache || {};
+		cache[key] = { version, data };
+		memory.reference_data_cache = cache;
+		persist("reference_data_cache", memory.reference_data_cache);
+	} catch (e) {
+		console.error("Failed to cache reference data", e);
+	}
+}
+
+// Call a versioned whitelisted method and resolve to its payload, taken from
+// the local cache when the server reports it unchanged.
+export async function fetchVersioned(method, args = {}) {
+	const key = `${method}::${JSON.stringify(args)}`;
+	const cached = getReferenceCache(key);
+	const r = await frappe.call({
+		method,
+		args: { ...args, version: cached ? cached.version : "" },
+	});
+	const message = r && r.message;
+	if (!message || message.version === undefined) {
+		// Server without content versions
+		return message;
+	}
+	if (message.not_modified && cached) {
+		return cached.data;
+	}
+	saveReferenceCache(key, message.version, message.data);
+	return message.data;
+}
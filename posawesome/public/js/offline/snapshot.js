@@ -0,0 +1,102 @@
+import { memory } from "./cache.js";
+import { persist } from "./core.js";
+
+function callServer(method, args) {
+	return new Promise((resolve, reject) => {
+		frappe.call({
+			method,
+			args,
+			callback: (r) => resolve(r.message),
+			error: (err) => reject(err),
+		});
+	});
+}
+
+function base64ToBytes(data) {
+	const binary = atob(data);
+	const bytes = new Uint8Array(binary.length);
+	for (let i = 0; i < binary.length; i++) {
+		bytes[i] = binary.charCodeAt(i);
+	}
+	return bytes;
+}
+
+async function sha256Hex(chunks) {
+	const buffer = await new Blob(chunks).arrayBuffer();
+	const digest = await crypto.subtle.digest("SHA-256", buffer);
+	return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+async function gunzipToText(chunks) {
+	const stream = new Blob(chunks).stream().pipeThrough(new DecompressionStream("gzip"));
+	return await new Response(stream).text();
+}
+
+export function getCatalogSnapshotVersion(profileName, priceList) {
+	try {
+		const versions = memory.catalog_snapshot_versions || {};
+		return versions[`${profileName}::${priceList || ""}`] || null;
+	} catch (e) {
+		return null;
+	}
+}
+
+export function setCatalogSnapshotVersion(profileName, priceList, manifest) {
+	try {
+		const versions = memory.catalog_snapshot_versions || {};
+		versions[`${profileName}::${priceList || ""}`] = {
+			version: manifest.version,
+			built_at: manifest.built_at,
+		};
+		memory.catalog_snapshot_versions = versions;
+		persist("catalog_snapshot_versions", memory.catalog_snapshot_versions);
+	} catch (e) {
+		console.error("Failed to store catalog snapshot version", e);
+	}
+}
+
+// Download the server side catalog snapshot for the profile in fixed-size
+// chunks. Resolves to { manifest, items } or null when no snapshot is ready
+// or the download does not match the manifest checksum, so callers can fall
+// back to paged get_items loading.
+export async function downloadCatalogSnapshot(posProfile, priceList, onProgress = null) {
+	// crypto.subtle is only available in secure contexts
+	if (typeof DecompressionStream === "undefined" || !globalThis.crypto?.subtle) {
+		return null;
+	}
+	try {
+		const args = { pos_profile: posProfile.name, price_list: priceList };
+		const manifest = await callServer(
+			"posawesome.posawesome.api.catalog_snapshot.get_catalog_snapshot_manifest",
+			args,
+		);
+		if (!manifest || manifest.status !== "ready") {
+			return null;
+		}
+
+		const chunks = [];
+		for (let index = 0; index < manifest.chunk_count; index++) {
+			const chunk = await callServer(
+				"posawesome.posawesome.api.catalog_snapshot.get_catalog_snapshot_chunk",
+				{ ...args, version: manifest.version, chunk_index: index },
+			);
+			chunks.push(base64ToBytes(chunk.data));
+			if (onProgress) {
+				onProgress(index + 1, manifest.chunk_count);
+			}
+		}
+
+		const checksum = await sha256Hex(chunks);
+		if (checksum !== manifest.sha256) {
+			console.error("Catalog snapshot checksum mismatch", manifest.version);
+			return null;
+		}
+
+		const items = JSON.parse(await gunzipToText(chunks));
+		setCatalogSnapshotVersion(posProfile.name, priceList, manifest);
+		return { manifest, items };
+	} catch (e) {
+		console.error("Failed to download catalog snapshot", e);
+		return null;
+	}
+}
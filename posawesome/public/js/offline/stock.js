@@ -164,18 +164,18 @@ export function clearLocalStockCache() {
 	persist("local_stock_cache", memory.local_stock_cache);
 }
 
-// Add this new function to fetch stock quantities
-export async function fetchItemStockQuantities(items, pos_profile, chunkSize = 100) {
+// Fetch current quantities from the profile warehouse's Bins, many items per call
+export async function fetchItemStockQuantities(items, pos_profile, chunkSize = 1000) {
 	const allItems = [];
 	try {
 		for (let i = 0; i < items.length; i += chunkSize) {
 			const chunk = items.slice(i, i + chunkSize);
 			const response = await new Promise((resolve, reject) => {
 				frappe.call({
-					method: "posawesome.posawesome.api.posapp.get_items_details",
+					method: "posawesome.posawesome.api.items.get_warehouse_stock",
 					args: {
-						pos_profile: JSON.stringify(pos_profile),
-						items_data: JSON.stringify(chunk),
+						warehouse: pos_profile.warehouse,
+						item_codes: JSON.stringify(chunk.map((it) => it.item_code)),
 					},
 					freeze: false,
 					callback: function (r) {
@@ -0,0 +1,67 @@
+// Read the NDJSON catalog stream of a POS Profile. onBatch receives the items
+// parsed from each network chunk as soon as they arrive, so the caller can
+// render before the download completes. Resolves to { items, complete } or
+// null when streaming is unavailable so callers can fall back to paging.
+export async function streamCatalogItems(posProfile, priceList, { itemGroup, customer, onBatch } = {}) {
+	if (typeof TextDecoder === "undefined" || typeof ReadableStream === "undefined") {
+		return null;
+	}
+	try {
+		const res = await fetch("/api/method/posawesome.posawesome.api.catalog_stream.stream_items", {
+			method: "POST",
+			headers: {
+				"Content-Type": "application/json",
+				"X-Frappe-CSRF-Token": frappe.csrf_token,
+			},
+			credentials: "same-origin",
+			body: JSON.stringify({
+				pos_profile: JSON.stringify(posProfile),
+				price_list: priceList,
+				item_group: itemGroup,
+				customer,
+			}),
+		});
+		if (!res.ok || !res.body) {
+			return null;
+		}
+
+		const reader = res.body.getReader();
+		const decoder = new TextDecoder();
+		const items = [];
+		let buffer = "";
+		let complete = false;
+
+		const handleLines = (lines) => {
+			const batch = [];
+			lines.forEach((line) => {
+				if (!line.trim()) return;
+				const row = JSON.parse(line);
+				if (row.done) {
+					complete = true;
+				} else {
+					batch.push(row);
+				}
+			});
+			if (batch.length) {
+				items.push(...batch);
+				if (onBatch) {
+					onBatch(batch, items.length);
+				}
+			}
+		};
+
+		for (;;) {
+			const { done, value } = await reader.read();
+			if (done) break;
+			buffer += decoder.decode(value, { stream: true });
+			const lines = buffer.split("\n");
+			buffer = lines.pop();
+			handleLines(lines);
+		}
+		handleLines([buffer + decoder.decode()]);
+		return { items, complete };
+	} catch (e) {
+		console.error("Failed to stream catalog items", e);
+		return null;
+	}
+}
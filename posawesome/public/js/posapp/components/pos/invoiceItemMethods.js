@@ -25,6 +25,7 @@ import { useBatchSerial } from "../../composables/useBatchSerial.js";
 import { useDiscounts } from "../../composables/useDiscounts.js";
 import { useItemAddition } from "../../composables/useItemAddition.js";
 import { useStockUtils } from "../../composables/useStockUtils.js";
+import { setUomPrice } from "../../../utils/uomPrices.js";
 
 const { setSerialNo, setBatchQty } = useBatchSerial();
 const { updateDiscountAmount, calcPrices, calcItemPrice } = useDiscounts();
@@ -1270,9 +1271,10 @@ export default {
 					);
 					if (updated_item) {
 						item.actual_qty = updated_item.actual_qty;
-						item.serial_no_data = updated_item.serial_no_data;
+						item.serial_no_count = updated_item.serial_no_count;
 						item.batch_no_data = updated_item.batch_no_data;
 						item.item_uoms = updated_item.item_uoms;
+						item.uom_prices = updated_item.uom_prices;
 						item.has_batch_no = updated_item.has_batch_no;
 						item.has_serial_no = updated_item.has_serial_no;
 					}
@@ -1740,6 +1742,7 @@ export default {
 						if (!r.exc) {
 							item.price_list_rate = rate;
 							item.base_price_list_rate = rate;
+							setUomPrice(item, item.uom, rate);
 							if (!item._manual_rate_set) {
 								item.rate = rate;
 								item.base_rate = rate;
@@ -1,5 +1,6 @@
 import { ref, nextTick } from "vue";
 import _ from "lodash";
+import { lookupUomPrice } from "../../utils/uomPrices.js";
 
 export function useItemAddition() {
 	// Remove item from invoice
@@ -80,18 +81,23 @@ export function useItemAddition() {
 				await context.calc_uom(new_item, new_item.uom);
 			}
 
-			// Attempt to fetch an explicit rate for this UOM from the active price list
+			// Attempt to take an explicit rate for this UOM from the item's price
+			// matrix, or fetch it from the active price list
 			try {
-				const r = await frappe.call({
-					method: "posawesome.posawesome.api.items.get_price_for_uom",
-					args: {
-						item_code: new_item.item_code,
-						price_list: context.get_price_list ? context.get_price_list() : null,
-						uom: new_item.uom,
-					},
-				});
-				if (r.message) {
-					const price = parseFloat(r.message);
+				let uomRate = lookupUomPrice(new_item, new_item.uom);
+				if (uomRate === undefined) {
+					const r = await frappe.call({
+						method: "posawesome.posawesome.api.items.get_price_for_uom",
+						args: {
+							item_code: new_item.item_code,
+							price_list: context.get_price_list ? context.get_price_list() : null,
+							uom: new_item.uom,
+						},
+					});
+					uomRate = r.message;
+				}
+				if (uomRate) {
+					const price = parseFloat(uomRate);
 					const baseCurrency = context.price_list_currency || context.pos_profile.currency;
 
 					// Convert price to selected currency when multi-currency is enabled
@@ -1,5 +1,5 @@
 import { ref, getCurrentInstance } from "vue";
-import { getCachedOffers, saveOffers } from "../../offline/index.js";
+import { getCachedOffers, saveOffers, fetchVersioned } from "../../offline/index.js";
 
 export function useOffers() {
     const { proxy } = getCurrentInstance();
@@ -14,14 +14,13 @@ export function useOffers() {
                 eventBus?.emit("set_offers", cached);
             }
         }
-        return frappe
-            .call("posawesome.posawesome.api.offers.get_offers", { profile: profileName })
-            .then((r) => {
-                if (r.message) {
+        return fetchVersioned("posawesome.posawesome.api.offers.get_offers", { profile: profileName })
+            .then((data) => {
+                if (data) {
                     console.info("LoadOffers");
-                    saveOffers(r.message);
-                    offers.value = r.message;
-                    eventBus?.emit("set_offers", r.message);
+                    saveOffers(data);
+                    offers.value = data;
+                    eventBus?.emit("set_offers", data);
                 }
             })
             .catch((err) => {
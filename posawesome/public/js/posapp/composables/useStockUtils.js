@@ -1,5 +1,6 @@
 import { ref } from "vue";
 import { isOffline } from "../../offline/index.js";
+import { lookupUomPrice } from "../../utils/uomPrices.js";
 
 export function useStockUtils() {
 	// Calculate UOM conversion and update item rates
@@ -49,7 +50,12 @@ export function useStockUtils() {
                                 uomRate = match.price_list_rate || match.rate;
                         }
                 }
-                if (!uomRate && typeof isOffline === "function" && !isOffline()) {
+                // The item's price matrix also tells when a UOM has no price of its own
+                const matrixRate = uomRate ? undefined : lookupUomPrice(item, new_uom.uom);
+                if (matrixRate) {
+                        uomRate = matrixRate;
+                }
+                if (!uomRate && matrixRate === undefined && typeof isOffline === "function" && !isOffline()) {
                         try {
                                 const r = await frappe.call({
                                         method: "posawesome.posawesome.api.items.get_price_for_uom",
@@ -87,6 +87,43 @@ async function bulkPutPrices(priceList, items) {
 	}
 }
 
+// Mirror of decodeColumnar in utils/columnar.js; classic workers cannot
+// import ES modules.
+function decodeColumnar(payload) {
+	if (!payload || payload.format !== "columnar") {
+		return payload;
+	}
+	const { fields, columns, count } = payload;
+	const encodings = payload.encodings || {};
+	const rows = new Array(count);
+	for (let r = 0; r < count; r++) {
+		const row = {};
+		for (let f = 0; f < fields.length; f++) {
+			const encoding = encodings[fields[f]];
+			let value = columns[f][r];
+			if (encoding && value !== null && value !== undefined) {
+				if (encoding.type === "dict") {
+					value = encoding.values[value];
+					if (Array.isArray(value)) {
+						value = value.map((v) => (v && typeof v === "object" ? { ...v } : v));
+					}
+				} else if (encoding.type === "tuples") {
+					value = value.map((tuple) => {
+						const entry = {};
+						encoding.keys.forEach((key, i) => {
+							entry[key] = tuple[i];
+						});
+						return entry;
+					});
+				}
+			}
+			row[fields[f]] = value;
+		}
+		rows[r] = row;
+	}
+	return rows;
+}
+
 self.onmessage = async (event) => {
 	// Logging every message can flood the console and increase memory usage
 	// when the worker is used for frequent persistence operations. Remove
@@ -96,6 +133,10 @@ self.onmessage = async (event) => {
 		try {
 			let parsed = JSON.parse(data.json);
 			let itemsRaw = parsed.message || parsed;
+			if (itemsRaw && itemsRaw.items && itemsRaw.items.format === "columnar") {
+				itemsRaw = itemsRaw.items;
+			}
+			itemsRaw = decodeColumnar(itemsRaw);
 			let items;
 			try {
 				if (typeof structuredClone === "function") {
@@ -115,12 +156,14 @@ self.onmessage = async (event) => {
 				description: it.description,
 				stock_uom: it.stock_uom,
 				image: it.image,
+				thumbnail: it.thumbnail,
 				item_group: it.item_group,
 				rate: it.rate,
 				price_list_rate: it.price_list_rate,
 				currency: it.currency,
 				item_barcode: it.item_barcode,
 				item_uoms: it.item_uoms,
+				uom_prices: it.uom_prices,
 				actual_qty: it.actual_qty,
 				has_batch_no: it.has_batch_no,
 				has_serial_no: it.has_serial_no,
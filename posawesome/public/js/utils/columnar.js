@@ -0,0 +1,44 @@
+// Decoder for the columnar wire format returned by item and customer APIs
+// when called with wire_format: "columnar" (see api/columnar.py).
+// itemWorker.js keeps a copy since classic workers cannot import modules.
+
+function decodeCell(value, encoding) {
+	if (!encoding || value === null || value === undefined) {
+		return value;
+	}
+	if (encoding.type === "dict") {
+		return encoding.values[value];
+	}
+	if (encoding.type === "tuples") {
+		return value.map((tuple) => {
+			const entry = {};
+			encoding.keys.forEach((key, i) => {
+				entry[key] = tuple[i];
+			});
+			return entry;
+		});
+	}
+	return value;
+}
+
+export function decodeColumnar(payload) {
+	if (!payload || payload.format !== "columnar") {
+		return payload;
+	}
+	const { fields, columns, count } = payload;
+	const encodings = payload.encodings || {};
+	const rows = new Array(count);
+	for (let r = 0; r < count; r++) {
+		const row = {};
+		for (let f = 0; f < fields.length; f++) {
+			const encoding = encodings[fields[f]];
+			const value = decodeCell(columns[f][r], encoding);
+			// Dictionary values are shared between rows; copy nested lists
+			row[fields[f]] = encoding && encoding.type === "dict" && Array.isArray(value)
+				? value.map((v) => (v && typeof v === "object" ? { ...v } : v))
+				: value;
+		}
+		rows[r] = row;
+	}
+	return rows;
+}
@@ -0,0 +1,31 @@
+// Client for the paged serial number lookup in api/serial_nos.py. Item
+// payloads only carry serial_no_count, so serials are fetched as needed.
+
+const METHOD_PREFIX = "posawesome.posawesome.api.serial_nos.";
+
+// Return { serial_nos, has_more } of Active serials starting with `txt`.
+export async function searchSerialNos(itemCode, warehouse, txt = "", after = null) {
+	const r = await frappe.call({
+		method: METHOD_PREFIX + "search_serial_nos",
+		args: { item_code: itemCode, warehouse, txt, after },
+	});
+	return r.message || { serial_nos: [], has_more: 0 };
+}
+
+// Check many scanned serials at once; returns { valid, invalid: [{serial_no, reason}] }.
+export async function validateSerialNos(itemCode, warehouse, serialNos) {
+	const r = await frappe.call({
+		method: METHOD_PREFIX + "validate_serial_nos",
+		args: { item_code: itemCode, warehouse, serial_nos: JSON.stringify(serialNos) },
+	});
+	return r.message || { valid: [], invalid: [] };
+}
+
+// Resolve serials to their items; returns { serial_no: item_code } for Active ones.
+export async function getSerialNoItems(serialNos, warehouse) {
+	const r = await frappe.call({
+		method: METHOD_PREFIX + "get_serial_no_items",
+		args: { serial_nos: JSON.stringify(serialNos), warehouse },
+	});
+	return r.message || {};
+}
@@ -0,0 +1,23 @@
+// Lookups in the per-item UOM price matrix (uom_prices) carried by the item
+// payload, see get_uom_prices in api/item_enrichment.py.
+
+// Return the price list rate of `uom` from the item's matrix, null when the
+// UOM has no Item Price of its own, or undefined when the matrix does not
+// cover it and the server has to be asked.
+export function lookupUomPrice(item, uom) {
+	const prices = item && item.uom_prices;
+	if (!prices || !uom || !Object.prototype.hasOwnProperty.call(prices, uom)) {
+		return undefined;
+	}
+	const rate = prices[uom].price_list_rate;
+	return rate === null || rate === undefined ? null : rate;
+}
+
+// Record a rate changed on the till so later UOM switches see it.
+export function setUomPrice(item, uom, rate) {
+	if (!item || !item.uom_prices || !uom) {
+		return;
+	}
+	const current = item.uom_prices[uom] || { conversion_factor: 1 };
+	item.uom_prices[uom] = { ...current, price_list_rate: rate };
+}